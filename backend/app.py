@@ -2,42 +2,68 @@ from flask import Flask, jsonify
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_cors import CORS
-from flask_jwt_extended import JWTManager
+from flask_jwt_extended import JWTManager, jwt_required, get_jwt_identity
 from flask_bcrypt import Bcrypt
-from datetime import timedelta
+from werkzeug.middleware.proxy_fix import ProxyFix
 import os
 from dotenv import load_dotenv
+from utils.sharding import ShardedSession
 
 # Load environment variables
 load_dotenv()
 
 # Initialize Flask extensions
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': ShardedSession})
 migrate = Migrate()
 jwt = JWTManager()
 bcrypt = Bcrypt()
 
-def create_app():
+def create_app(config_name=None):
     """Application factory pattern"""
     app = Flask(__name__)
     
     # Configuration
-    app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'your-secret-key-change-this')
-    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get(
-        'DATABASE_URL', 
-        'sqlite:///markyou.db'
-    )
-    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-    app.config['JWT_SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY', 'jwt-secret-key')
-    app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=24)
-    app.config['JWT_REFRESH_TOKEN_EXPIRES'] = timedelta(days=30)
+    from config.config import config
+    config_name = config_name or os.environ.get('FLASK_CONFIG', 'default')
+    app.config.from_object(config[config_name])
+    
+    # Trust X-Forwarded-* only from the configured number of proxies
+    if app.config.get('PROXY_FIX_X_FOR') or app.config.get('PROXY_FIX_X_PROTO'):
+        app.wsgi_app = ProxyFix(
+            app.wsgi_app,
+            x_for=app.config.get('PROXY_FIX_X_FOR', 0),
+            x_proto=app.config.get('PROXY_FIX_X_PROTO', 0)
+        )
     
     # Initialize extensions
+    from utils.archive import configure_archive, attach_archive
+    from utils.sharding import shard_router
+    configure_archive(app)
+    shard_router.init_app(app)
     db.init_app(app)
-    migrate.init_app(app, db)
+    attach_archive(app)
+    migrate.init_app(app, db, render_as_batch=True)
     jwt.init_app(app)
     bcrypt.init_app(app)
-    CORS(app, origins=["http://localhost:3000"], supports_credentials=True)
+    CORS(app, origins=app.config['CORS_ORIGINS'].split(','), supports_credentials=True)
+    
+    from utils.revocation import revocation_list
+    revocation_list.init_app(app)
+    
+    from utils.rate_limit import rate_limiter
+    rate_limiter.init_app(app)
+    
+    from utils.profiling import request_profiler
+    request_profiler.init_app(app)
+    
+    from utils.group_commit import group_writer
+    group_writer.init_app(app)
+    
+    from utils.live_feed import attendance_watcher
+    attendance_watcher.init_app(app)
+    
+    from utils.compression import init_compression
+    init_compression(app)
     
     # Import and register blueprints
     from routes.auth import auth_bp
@@ -50,6 +76,10 @@ def create_app():
     app.register_blueprint(users_bp, url_prefix='/api/users')
     app.register_blueprint(dashboard_bp, url_prefix='/api/dashboard')
     
+    # CLI commands (flask init-db, ...)
+    from commands import register_commands
+    register_commands(app)
+    
     # Error handlers
     @app.errorhandler(404)
     def not_found(error):
@@ -67,6 +97,17 @@ def create_app():
             'message': 'MarkYou API is running'
         })
     
+    # In-process counters and timings (per worker), for teachers only
+    @app.route('/api/metrics')
+    @jwt_required()
+    def get_metrics():
+        from models.user import User
+        from utils.metrics import metrics
+        user = User.query.get(get_jwt_identity())
+        if not user or user.role != 'teacher':
+            return jsonify({'error': 'Access denied'}), 403
+        return jsonify(metrics.snapshot())
+    
     return app
 
 if __name__ == '__main__':
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Compression benchmark: CPU time vs bytes saved per encoding and level.
+
+Builds a roster payload shaped like GET /api/attendance/session/<id>
+(attendance records with nested user and class_session/teacher objects)
+and compresses it at several levels.
+
+    python benchmarks/compression_benchmark.py [--records 2000] [--repeat 5]
+"""
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.compression import brotli
+
+GZIP_LEVELS = (1, 3, 6, 9)
+BROTLI_LEVELS = (1, 4, 6, 9, 11)
+
+
+def build_payload(records):
+    teacher = {
+        'id': 1, 'prn': 'T001', 'name': 'Dr. John Smith', 'email': 'john.smith@university.edu',
+        'role': 'teacher', 'class_name': 'FY', 'department': 'CSE', 'is_active': True,
+        'created_at': '2024-06-01T09:00:00'
+    }
+    class_session = {
+        'id': 42, 'subject_id': 3, 'subject': 'Data Structures', 'class_name': 'FY', 'department': 'CSE',
+        'division': 'A', 'date': '2024-09-02', 'start_time': '09:00:00', 'end_time': '10:00:00',
+        'teacher_id': 1, 'roll_start': 1, 'roll_end': records, 'is_active': True,
+        'created_at': '2024-09-02T08:59:12', 'teacher': teacher
+    }
+    attendances = []
+    for i in range(1, records + 1):
+        attendances.append({
+            'id': 1000 + i, 'user_id': 10 + i, 'class_session_id': 42,
+            'status': 'absent' if i % 9 == 0 else 'present',
+            'recorded_at': f'2024-09-02T09:0{i % 10}:{i % 60:02d}', 'recorded_by': 1, 'notes': None,
+            'user': {
+                'id': 10 + i, 'prn': f'S{i:05d}', 'name': f'Student {i}', 'email': f'student{i}@university.edu',
+                'role': 'student', 'class_name': 'FY', 'department': 'CSE', 'is_active': True,
+                'created_at': '2024-06-01T09:00:00'
+            },
+            'class_session': class_session
+        })
+    return json.dumps({'class_session': class_session, 'attendances': attendances}).encode()
+
+
+def measure(name, level, compress, body, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        compressed = compress(body)
+        best = min(best, time.perf_counter() - started)
+    saved = 1 - len(compressed) / len(body)
+    print(f'{name:<8}{level:>6}{len(compressed):>14,}{saved:>10.1%}{best * 1000:>12.2f}{len(body) / best / 1e6:>12.1f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--records', type=int, default=2000, help='attendance records in the payload')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per level (best time is reported)')
+    args = parser.parse_args()
+    
+    body = build_payload(args.records)
+    print(f'Payload: {args.records} records, {len(body):,} bytes\n')
+    print(f'{"encoding":<8}{"level":>6}{"bytes":>14}{"saved":>10}{"cpu ms":>12}{"MB/s":>12}')
+    
+    for level in GZIP_LEVELS:
+        measure('gzip', level, lambda data: gzip.compress(data, compresslevel=level), body, args.repeat)
+    
+    if brotli is None:
+        print('\nbrotli not installed; pip install brotli to include it')
+        return
+    for level in BROTLI_LEVELS:
+        measure('br', level, lambda data: brotli.compress(data, quality=level), body, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+Load test: lecture-start bursts against a running server.
+
+Seeds a throwaway SQLite database with teachers and class rosters, serves
+the app from a multi-threaded server and drives scripted traffic from
+concurrent clients for a fixed time:
+    
+    teachers  POST /attendance/record, PUT /attendance/update (a few
+              absentees), GET /attendance/session/<id>
+    students  GET /dashboard/stats, now and then GET /attendance/student/<id>
+
+Reports throughput, p50/p95/p99 latency per endpoint, errors, and SQLite
+lock contention ("database is locked" errors and writes that waited), then
+checks the run against a capacity target and exits non-zero if it missed.
+    
+    python benchmarks/load_test.py [--teachers 300] [--students 5000] [--clients 64]
+                                   [--duration 30] [--teacher-share 0.2]
+                                   [--server threaded|gunicorn]
+                                   [--target-rps 150] [--target-p95-ms 1000] [--json results.json]
+
+`threaded` runs the app in this process (Werkzeug, one thread per client
+connection) so SQL statements can be timed; `gunicorn` starts the production
+server (gunicorn.conf.py, SERVER_WORKERS/SERVER_THREADS from the environment)
+and only sees lock errors through responses.
+"""
+import argparse
+import http.client
+import itertools
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+JWT_SECRET = 'load-test-secret'
+DEPARTMENT = 'LOAD'
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def seed(app, teachers, students, class_size):
+    """Insert users with one shared password hash; returns (teacher, student) (id, class, token) lists"""
+    from sqlalchemy import insert, select
+    from flask_jwt_extended import create_access_token
+    from app import db, bcrypt
+    from models.user import User
+    
+    classes = max(1, -(-students // class_size))
+    with app.app_context():
+        db.create_all()
+        password_hash = bcrypt.generate_password_hash('loadtest').decode('utf-8')
+        now = datetime.utcnow()
+        
+        def user_row(prn, role, class_name):
+            return {
+                'prn': prn, 'name': prn, 'email': f'{prn.lower()}@load.test', 'password_hash': password_hash,
+                'role': role, 'class_name': class_name, 'department': DEPARTMENT, 'is_active': True,
+                'created_at': now, 'updated_at': now
+            }
+        
+        rows = [user_row(f'T{i:05d}', 'teacher', f'C{i % classes:04d}') for i in range(teachers)]
+        rows += [user_row(f'S{i:06d}', 'student', f'C{i // class_size:04d}') for i in range(students)]
+        for start in range(0, len(rows), 1000):
+            db.session.execute(insert(User.__table__), rows[start:start + 1000])
+        db.session.commit()
+        
+        users = {'teacher': [], 'student': []}
+        for user_id, role, class_name in db.session.execute(select(User.id, User.role, User.class_name)):
+            token = create_access_token(identity=user_id, additional_claims={'ver': 0})
+            users[role].append((user_id, class_name, token))
+    return users['teacher'], users['student']
+
+
+class SqlMonitor:
+    """Times write statements and counts lock errors (in-process server only)"""
+    
+    def __init__(self, engine, slow_ms):
+        from sqlalchemy import event
+        self.slow_seconds = slow_ms / 1000
+        self.lock = threading.Lock()
+        self.writes = self.slow_writes = self.lock_errors = 0
+        self.write_seconds = self.max_write_seconds = 0.0
+        event.listen(engine, 'before_cursor_execute', self.before)
+        event.listen(engine, 'after_cursor_execute', self.after)
+        event.listen(engine, 'handle_error', self.error)
+    
+    def before(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('load_test_started', []).append(time.perf_counter())
+    
+    def after(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['load_test_started'].pop()
+        if statement.lstrip()[:6].upper() in ('INSERT', 'UPDATE', 'DELETE'):
+            with self.lock:
+                self.writes += 1
+                self.write_seconds += elapsed
+                self.max_write_seconds = max(self.max_write_seconds, elapsed)
+                if elapsed >= self.slow_seconds:
+                    self.slow_writes += 1
+    
+    def error(self, context):
+        started = context.connection.info.get('load_test_started') if context.connection is not None else None
+        if started:
+            started.pop()
+        if 'database is locked' in str(context.original_exception):
+            with self.lock:
+                self.lock_errors += 1
+
+
+class Client(threading.Thread):
+    """One connection replaying teacher and student scripts until the deadline"""
+    
+    slot_counter = itertools.count()
+    
+    def __init__(self, host, port, teachers, students, rosters, teacher_share, deadline, seed_value):
+        super().__init__(daemon=True)
+        self.host, self.port = host, port
+        self.teachers, self.students, self.rosters = teachers, students, rosters
+        self.teacher_share = teacher_share
+        self.deadline = deadline
+        self.random = random.Random(seed_value)
+        self.latencies = {}
+        self.errors = {}
+        self.lock_errors = 0
+        self.connection = None
+    
+    def request(self, label, method, path, token, body=None):
+        headers = {'Authorization': f'Bearer {token}'}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body)
+            headers['Content-Type'] = 'application/json'
+        
+        started = time.perf_counter()
+        try:
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(self.host, self.port, timeout=60)
+            self.connection.request(method, path, payload, headers)
+            response = self.connection.getresponse()
+            data = response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            self.connection = None
+            data, status = b'', 'connection error'
+        elapsed = time.perf_counter() - started
+        
+        self.latencies.setdefault(label, []).append(elapsed)
+        if status not in (200, 201):
+            self.errors.setdefault(label, {}).setdefault(str(status), 0)
+            self.errors[label][str(status)] += 1
+            if b'database is locked' in data:
+                self.lock_errors += 1
+            return None
+        return json.loads(data)
+    
+    def teacher_script(self):
+        teacher_id, class_name, token = self.random.choice(self.teachers)
+        # Every recording gets its own slot: one minute apart, walking back a day per 1440
+        slot = next(self.slot_counter)
+        session_date = date.today() - timedelta(days=slot // 1440 % 30)
+        start = datetime.combine(session_date, datetime.min.time()) + timedelta(minutes=slot % 1440)
+        recorded = self.request('POST /attendance/record', 'POST', '/api/attendance/record', token, {
+            'subject': f'Subject {slot % 8}', 'class': class_name, 'dept': DEPARTMENT,
+            'date': session_date.isoformat(), 'timeStart': start.strftime('%H:%M'), 'timeEnd': '23:59',
+            'rollStart': 1, 'rollEnd': 999
+        })
+        if not recorded:
+            return
+        session_id = recorded['class_session']['id']
+        
+        roster = self.rosters.get(class_name, [])
+        absentees = self.random.sample(roster, min(3, len(roster)))
+        self.request('PUT /attendance/update', 'PUT', '/api/attendance/update', token, {
+            'class_session_id': session_id,
+            'attendance_updates': [{'user_id': student_id, 'status': 'absent'} for student_id in absentees]
+        })
+        self.request('GET /attendance/session/<id>', 'GET', f'/api/attendance/session/{session_id}', token)
+    
+    def student_script(self):
+        student_id, _, token = self.random.choice(self.students)
+        self.request('GET /dashboard/stats', 'GET', '/api/dashboard/stats', token)
+        if self.random.random() < 0.25:
+            self.request('GET /attendance/student/<id>', 'GET', f'/api/attendance/student/{student_id}', token)
+    
+    def run(self):
+        while time.monotonic() < self.deadline:
+            if self.random.random() < self.teacher_share:
+                self.teacher_script()
+            else:
+                self.student_script()
+
+
+def start_threaded_server(app, port):
+    from werkzeug.serving import make_server, WSGIRequestHandler
+    
+    class KeepAliveHandler(WSGIRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        
+        def log_request(self, *args, **kwargs):
+            pass
+    
+    server = make_server('127.0.0.1', port, app, threaded=True, request_handler=KeepAliveHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server.shutdown
+
+
+def start_gunicorn(port, env):
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'],
+        cwd=BACKEND_DIR, env=dict(env, SERVER_BIND=f'127.0.0.1:{port}')
+    )
+    for _ in range(100):
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            connection.request('GET', '/api/health')
+            if connection.getresponse().status == 200:
+                return lambda: (process.terminate(), process.wait())
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise SystemExit('gunicorn did not start')
+
+
+def report(args, clients, elapsed, monitor):
+    latencies, errors = {}, {}
+    for client in clients:
+        for label, values in client.latencies.items():
+            latencies.setdefault(label, []).extend(values)
+        for label, statuses in client.errors.items():
+            for status, count in statuses.items():
+                errors.setdefault(label, {}).setdefault(status, 0)
+                errors[label][status] += count
+    
+    total = sum(len(values) for values in latencies.values())
+    failed = sum(sum(statuses.values()) for statuses in errors.values())
+    results = {
+        'config': vars(args),
+        'seconds': round(elapsed, 2),
+        'requests': total,
+        'throughput_rps': round(total / elapsed, 1),
+        'errors': failed,
+        'lock_errors': sum(client.lock_errors for client in clients),
+        'endpoints': {}
+    }
+    
+    print(f'\n{"endpoint":<30}{"requests":>10}{"rps":>9}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}{"errors":>8}')
+    for label in sorted(latencies):
+        values = sorted(latencies[label])
+        stats = {
+            'requests': len(values),
+            'rps': round(len(values) / elapsed, 1),
+            'p50_ms': round(percentile(values, 0.50) * 1000, 1),
+            'p95_ms': round(percentile(values, 0.95) * 1000, 1),
+            'p99_ms': round(percentile(values, 0.99) * 1000, 1),
+            'errors': errors.get(label, {})
+        }
+        results['endpoints'][label] = stats
+        print(f'{label:<30}{stats["requests"]:>10}{stats["rps"]:>9}{stats["p50_ms"]:>10}'
+              f'{stats["p95_ms"]:>10}{stats["p99_ms"]:>10}{sum(stats["errors"].values()):>8}')
+    
+    print(f'\n{total} requests in {elapsed:.1f}s: {results["throughput_rps"]} req/s, '
+          f'{failed} errors ({results["lock_errors"]} "database is locked")')
+    for label, statuses in sorted(errors.items()):
+        print(f'  {label}: ' + ', '.join(f'{status} x{count}' for status, count in sorted(statuses.items())))
+    
+    if monitor is not None:
+        results['sql'] = {
+            'writes': monitor.writes,
+            'slow_writes': monitor.slow_writes,
+            'lock_errors': monitor.lock_errors,
+            'avg_write_ms': round(monitor.write_seconds / monitor.writes * 1000, 2) if monitor.writes else 0,
+            'max_write_ms': round(monitor.max_write_seconds * 1000, 1)
+        }
+        print(f'SQL: {monitor.writes} writes, avg {results["sql"]["avg_write_ms"]} ms, '
+              f'max {results["sql"]["max_write_ms"]} ms; {monitor.slow_writes} took >= {args.slow_write_ms} ms '
+              f'(waiting on the write lock); {monitor.lock_errors} lock errors')
+    
+    worst_p95 = max((stats['p95_ms'] for stats in results['endpoints'].values()), default=0)
+    error_rate = failed / total if total else 1
+    checks = [
+        (f'throughput {results["throughput_rps"]} >= {args.target_rps} req/s', results['throughput_rps'] >= args.target_rps),
+        (f'worst p95 {worst_p95} <= {args.target_p95_ms} ms', worst_p95 <= args.target_p95_ms),
+        (f'error rate {error_rate:.2%} <= {args.max_error_rate:.2%}', error_rate <= args.max_error_rate)
+    ]
+    results['target_met'] = all(passed for _, passed in checks)
+    
+    print('\nCapacity target:')
+    for description, passed in checks:
+        print(f'  [{"ok" if passed else "FAIL"}] {description}')
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--teachers', type=int, default=300)
+    parser.add_argument('--students', type=int, default=5000)
+    parser.add_argument('--class-size', type=int, default=60, help='students per class roster')
+    parser.add_argument('--clients', type=int, default=64, help='concurrent client connections')
+    parser.add_argument('--duration', type=float, default=30, help='seconds of traffic')
+    parser.add_argument('--teacher-share', type=float, default=0.2, help='fraction of scripts run as a teacher')
+    parser.add_argument('--server', choices=['threaded', 'gunicorn'], default='threaded')
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--group-commit', action='store_true', help='run with GROUP_COMMIT_ENABLED')
+    parser.add_argument('--database', help='SQLite file to use (default: a temporary file)')
+    parser.add_argument('--slow-write-ms', type=float, default=100, help='write time counted as a lock wait')
+    parser.add_argument('--target-rps', type=float, default=150)
+    parser.add_argument('--target-p95-ms', type=float, default=1000)
+    parser.add_argument('--max-error-rate', type=float, default=0.01)
+    parser.add_argument('--seed', type=int, default=1, help='random seed for the traffic scripts')
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args()
+    
+    workdir = tempfile.mkdtemp(prefix='markyou-load-')
+    database = args.database or os.path.join(workdir, 'load.db')
+    # The server must see the same database and signing key as the seeding
+    # step, and per-user rate limits would turn the test into 429s
+    os.environ.update({
+        'DATABASE_URL': f'sqlite:///{os.path.abspath(database)}',
+        'JWT_SECRET_KEY': JWT_SECRET,
+        'RATELIMIT_ENABLED': 'false',
+        'GROUP_COMMIT_ENABLED': 'true' if args.group_commit else 'false'
+    })
+    
+    from app import create_app, db
+    app = create_app()
+    
+    print(f'Seeding {args.teachers} teachers and {args.students} students into {database} ...')
+    started = time.perf_counter()
+    teachers, students = seed(app, args.teachers, args.students, args.class_size)
+    print(f'Seeded in {time.perf_counter() - started:.1f}s')
+    
+    rosters = {}
+    for student_id, class_name, _ in students:
+        rosters.setdefault(class_name, []).append(student_id)
+    
+    monitor = None
+    if args.server == 'threaded':
+        with app.app_context():
+            monitor = SqlMonitor(db.engine, args.slow_write_ms)
+        stop = start_threaded_server(app, args.port)
+    else:
+        stop = start_gunicorn(args.port, os.environ)
+    
+    print(f'Driving {args.clients} clients for {args.duration:.0f}s against the {args.server} server ...')
+    deadline = time.monotonic() + args.duration
+    clients = [
+        Client('127.0.0.1', args.port, teachers, students, rosters, args.teacher_share, deadline, args.seed + i)
+        for i in range(args.clients)
+    ]
+    started = time.perf_counter()
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    elapsed = time.perf_counter() - started
+    stop()
+    
+    results = report(args, clients, elapsed, monitor)
+    if args.json:
+        with open(args.json, 'w') as output:
+            json.dump(results, output, indent=2)
+    sys.exit(0 if results['target_met'] else 1)
+
+
+if __name__ == '__main__':
+    main()
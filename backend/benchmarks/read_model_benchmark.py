@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Read-model benchmark: ORM instances vs Core selects into __slots__ records.
+
+Seeds a throwaway SQLite database and serializes the same lists both ways:
+the ORM path (query + loader options + to_dict/Fieldset) that list endpoints
+used before, and utils/read_models.py. Reports CPU time and peak Python
+memory (tracemalloc) per 1,000 rows, best of --repeat runs, for:
+    
+    users                    GET /api/users/
+    attendances (default)    GET /api/attendance/student/<id>, user + class_session + teacher embedded
+    attendances (sparse)     ?fields=user_id,status
+    
+    python benchmarks/read_model_benchmark.py [--rows 5000] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, time as clock, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def seed(db, rows):
+    from sqlalchemy import insert
+    from models import User, Subject, ClassSession, Attendance
+    
+    now = datetime.utcnow()
+    students = max(1, rows // 50)
+    sessions = -(-rows // students)
+    
+    db.session.execute(insert(User.__table__), [
+        {
+            'prn': f'U{i:06d}', 'name': f'User {i}', 'email': f'user{i}@bench.test', 'password_hash': 'x',
+            'role': 'teacher' if i == 0 else 'student', 'class_name': 'FY', 'department': 'CSE',
+            'is_active': True, 'created_at': now, 'updated_at': now
+        }
+        for i in range(students + 1)
+    ])
+    db.session.execute(insert(Subject.__table__), [{'name': 'Benchmarks', 'department': 'CSE'}])
+    db.session.execute(insert(ClassSession.__table__), [
+        {
+            'subject_id': 1, 'class_name': 'FY', 'department': 'CSE', 'date': date.today() - timedelta(days=i),
+            'start_time': clock(9), 'end_time': clock(10), 'teacher_id': 1, 'roll_start': 1,
+            'roll_end': students, 'is_active': True, 'created_at': now
+        }
+        for i in range(sessions)
+    ])
+    db.session.execute(insert(Attendance.__table__), [
+        {
+            'user_id': 2 + i % students, 'class_session_id': 1 + i // students, 'status': 'present',
+            'recorded_at': now, 'recorded_by': 1
+        }
+        for i in range(rows)
+    ])
+    db.session.commit()
+
+
+def measure(db, run, repeat):
+    """Best CPU seconds and peak traced bytes for run() over `repeat` runs"""
+    best_cpu = best_peak = float('inf')
+    count = 0
+    for _ in range(repeat):
+        db.session.remove()
+        started = time.process_time()
+        count = len(run())
+        best_cpu = min(best_cpu, time.process_time() - started)
+        db.session.remove()
+        
+        tracemalloc.start()
+        run()
+        best_peak = min(best_peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return count, best_cpu, best_peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=5000, help='attendance rows to load')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per case (best is reported)')
+    args = parser.parse_args()
+    
+    database = os.path.join(tempfile.mkdtemp(prefix='markyou-bench-'), 'bench.db')
+    os.environ['DATABASE_URL'] = f'sqlite:///{database}'
+    
+    from app import create_app, db
+    from models import User, Attendance
+    from utils.fieldsets import Fieldset
+    from utils.read_models import ReadModel
+    
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        seed(db, args.rows)
+        
+        def orm(model, fieldset_args, where):
+            def run():
+                fieldset = Fieldset(model, *fieldset_args)
+                rows = model.query.options(*fieldset.query_options()).filter(where).all()
+                return fieldset.serialize_all(rows)
+            return run
+        
+        def read_model(model, fieldset_args, where):
+            def run():
+                reader = ReadModel(Fieldset(model, *fieldset_args))
+                return reader.fieldset.serialize_all(reader.all(reader.select().where(where)))
+            return run
+        
+        cases = [
+            ('users', User, (None, None), User.role == 'student'),
+            ('attendances (default)', Attendance, (None, None), Attendance.id > 0),
+            ('attendances (sparse)', Attendance, (['user_id', 'status'], None), Attendance.id > 0)
+        ]
+        
+        print(f'{"case":<24}{"path":<12}{"rows":>8}{"cpu ms/1k":>12}{"peak KiB/1k":>14}')
+        for name, model, fieldset_args, where in cases:
+            results = {}
+            for path, factory in (('orm', orm), ('read model', read_model)):
+                count, cpu, peak = measure(db, factory(model, fieldset_args, where), args.repeat)
+                per_k = 1000 / max(count, 1)
+                results[path] = (cpu * per_k, peak * per_k)
+                print(f'{name:<24}{path:<12}{count:>8}{cpu * per_k * 1000:>12.2f}{peak * per_k / 1024:>14.1f}')
+            (orm_cpu, orm_peak), (rm_cpu, rm_peak) = results['orm'], results['read model']
+            print(f'{"":<24}{"saved":<12}{"":>8}{1 - rm_cpu / orm_cpu:>12.0%}{1 - rm_peak / orm_peak:>14.0%}')
+
+
+if __name__ == '__main__':
+    main()
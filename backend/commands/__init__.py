@@ -0,0 +1,20 @@
+# CLI commands package
+
+
+def register_commands(app):
+    """Attach the project's CLI commands to the app"""
+    from commands.database import init_db_command
+    from commands.archive import archive_cli
+    from commands.timetable import timetable_cli
+    from commands.seed import seed_command
+    from commands.shards import shards_cli
+    from commands.profiles import profiles_cli
+    from commands.rollups import rollups_cli
+    
+    app.cli.add_command(init_db_command)
+    app.cli.add_command(archive_cli)
+    app.cli.add_command(timetable_cli)
+    app.cli.add_command(seed_command)
+    app.cli.add_command(shards_cli)
+    app.cli.add_command(profiles_cli)
+    app.cli.add_command(rollups_cli)
@@ -0,0 +1,41 @@
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from app import db
+from models.archive import ArchivedYear
+from utils.archive import archive_academic_year
+
+archive_cli = AppGroup('archive', help='Move closed academic years out of the hot tables.')
+
+
+@archive_cli.command('year')
+@click.argument('start_year', type=int)
+@click.option('--dry-run', is_flag=True, help='Only report what would be moved.')
+def archive_year_command(start_year, dry_run):
+    """Archive the academic year that starts in START_YEAR (e.g. 2023 for 2023-24)"""
+    start_month = current_app.config['ACADEMIC_YEAR_START_MONTH']
+    try:
+        label, sessions, attendances = archive_academic_year(start_year, start_month, dry_run=dry_run)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    
+    if dry_run:
+        db.session.rollback()
+        click.echo(f'{label}: would archive {sessions} sessions and {attendances} attendance records.')
+        return
+    
+    db.session.commit()
+    click.echo(f'{label}: archived {sessions} sessions and {attendances} attendance records.')
+
+
+@archive_cli.command('list')
+def list_archived_years_command():
+    """List archived academic years"""
+    years = ArchivedYear.query.order_by(ArchivedYear.start_date).all()
+    if not years:
+        click.echo('Nothing archived yet.')
+    for year in years:
+        click.echo(
+            f'{year.academic_year}  {year.start_date} .. {year.end_date}  '
+            f'{year.sessions_archived} sessions, {year.attendances_archived} attendance records'
+        )
@@ -0,0 +1,71 @@
+import click
+from flask.cli import with_appcontext
+from flask_migrate import upgrade
+from app import db
+
+
+def seed_sample_data():
+    """Create a sample teacher and students if the users table is empty.
+    
+    Returns True when data was created.
+    """
+    from models import User
+    
+    if User.query.first():
+        return False
+    
+    # Create a sample teacher
+    teacher = User(
+        prn='T001',
+        name='Dr. John Smith',
+        email='john.smith@university.edu',
+        class_name='FY',
+        department='CSE',
+        role='teacher'
+    )
+    teacher.password = 'teacher123'
+    
+    # Create sample students
+    students = []
+    for i in range(1, 11):
+        student = User(
+            prn=f'S{i:03d}',
+            name=f'Student {i}',
+            email=f'student{i}@university.edu',
+            class_name='FY',
+            department='CSE',
+            role='student'
+        )
+        student.password = 'student123'
+        students.append(student)
+    
+    db.session.add(teacher)
+    db.session.add_all(students)
+    db.session.commit()
+    return True
+
+
+@click.command('init-db')
+@click.option('--sample/--no-sample', default=False, help='Also create sample users.')
+@with_appcontext
+def init_db_command(sample):
+    """Create database tables (and optionally sample data).
+    
+    Run this once before starting the production server so table creation
+    and seeding never happen in the serving path. Tables are created by the
+    migrations, on the main database and every shard, so each database is
+    stamped at the head revision and later `flask db upgrade` runs apply.
+    """
+    from utils.sharding import shard_router
+    
+    upgrade()
+    for department in shard_router.departments:
+        with shard_router.use(department):
+            upgrade()
+    click.echo('Database tables created.')
+    
+    if sample:
+        if seed_sample_data():
+            click.echo('Sample data created successfully!')
+        else:
+            click.echo('Users already exist, skipping sample data.')
@@ -0,0 +1,48 @@
+import click
+from flask.cli import AppGroup
+from utils.profiling import request_profiler
+
+profiles_cli = AppGroup('profiles', help='Profiles of requests sent with ?profile=1 (PROFILING_ENABLED).')
+
+
+@profiles_cli.command('list')
+@click.option('--endpoint', help='Only this endpoint (e.g. dashboard.get_dashboard_overview).')
+@click.option('--limit', type=int, default=20, show_default=True)
+def list_command(endpoint, limit):
+    """Show the newest stored profiles"""
+    profiles = request_profiler.profiles(endpoint)
+    if not profiles:
+        click.echo(f'No profiles in {request_profiler.directory}.')
+    for meta in profiles[:limit]:
+        click.echo(
+            f'{meta["id"]}  {meta["endpoint"]:<40} {meta["status"]}  {meta["duration_ms"]:>9.1f} ms  '
+            f'sql {meta["sql_ms"]:>8.1f} ms / {meta["queries"]} queries  user {meta["user_id"]}'
+        )
+
+
+@profiles_cli.command('top')
+@click.argument('endpoint')
+@click.option('-n', '--limit', type=int, default=20, show_default=True, help='Number of functions.')
+@click.option('--sort', type=click.Choice(['cumulative', 'tottime']), default='cumulative', show_default=True)
+@click.option('--last', type=int, help='Only the newest N profiles of the endpoint.')
+def top_command(endpoint, limit, sort, last):
+    """Hottest functions and SQL statements of ENDPOINT over its stored profiles"""
+    profiles = request_profiler.profiles(endpoint)[:last]
+    if not profiles:
+        raise click.ClickException(f'No profiles for {endpoint}.')
+    
+    durations = sorted(meta['duration_ms'] for meta in profiles)
+    click.echo(f'{endpoint}: {len(profiles)} profiles, median {durations[len(durations) // 2]:.1f} ms, '
+               f'max {durations[-1]:.1f} ms')
+    click.echo(f'\n{"calls":>9} {"tottime":>9} {"cumtime":>9}  function')
+    for function, calls, tottime, cumtime in request_profiler.hot_functions(profiles, limit, sort):
+        click.echo(f'{calls:>9} {tottime:>9.4f} {cumtime:>9.4f}  {function}')
+    
+    statements = {}
+    for meta in profiles:
+        for entry in meta['statements']:
+            count, total = statements.get(entry['statement'], (0, 0.0))
+            statements[entry['statement']] = (count + entry['count'], total + entry['total_ms'])
+    click.echo(f'\n{"count":>9} {"total ms":>9}  statement')
+    for statement, (count, total) in sorted(statements.items(), key=lambda item: item[1][1], reverse=True)[:limit]:
+        click.echo(f'{count:>9} {total:>9.2f}  {" ".join(statement.split())[:160]}')
@@ -0,0 +1,22 @@
+import time
+import click
+from flask.cli import AppGroup
+from utils.rollups import rollup_cube
+from utils.sharding import shard_router
+
+rollups_cli = AppGroup('rollups', help='Department x class x subject x week attendance rollups.')
+
+
+@rollups_cli.command('refresh')
+@click.option('--full', is_flag=True, help='Rebuild every cell instead of only the changed ones.')
+def refresh_command(full):
+    """Bring the rollups up to date; run it from cron to keep analytics fresh"""
+    # Each shard has its own rollups
+    for key in shard_router.keys():
+        started = time.perf_counter()
+        with shard_router.use(key):
+            cells = rollup_cube.refresh(full=full)
+        click.echo(
+            (f'{key or "main"}: ' if shard_router.enabled else '') +
+            f'{"rebuilt" if full else "refreshed"} {cells} cells in {time.perf_counter() - started:.2f}s.'
+        )
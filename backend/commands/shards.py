@@ -0,0 +1,70 @@
+import click
+from flask.cli import AppGroup
+from flask_migrate import upgrade
+from sqlalchemy import select, func
+from sqlalchemy.exc import OperationalError
+from app import db
+from utils.sharding import shard_router
+
+shards_cli = AppGroup('shards', help='Per-department databases (SHARD_DEPARTMENTS).')
+
+
+def _require_sharding():
+    if not shard_router.enabled:
+        raise click.ClickException('Sharding is off; list the sharded departments in SHARD_DEPARTMENTS.')
+
+
+@shards_cli.command('list')
+def list_command():
+    """Show every database with its row counts"""
+    from models import User, ClassSession, Attendance
+    
+    def counts():
+        try:
+            return [
+                db.session.execute(select(func.count()).select_from(model)).scalar()
+                for model in (User, ClassSession, Attendance)
+            ]
+        except OperationalError:
+            return None
+    
+    for key, result in shard_router.fan_out(counts):
+        url = shard_router.engine(key).url.render_as_string(hide_password=True)
+        if result is None:
+            click.echo(f'{key or "main":<10}{url}  (no tables, run flask shards upgrade)')
+        else:
+            click.echo(f'{key or "main":<10}{url}  {result[0]} users, {result[1]} sessions, {result[2]} attendances')
+
+
+@shards_cli.command('upgrade')
+@click.option('--revision', default='head', show_default=True, help='Revision to upgrade to.')
+def upgrade_command(revision):
+    """Run the migrations on every shard (the main database: flask db upgrade)"""
+    _require_sharding()
+    for department in shard_router.departments:
+        click.echo(f'{department}: {shard_router.engine(department).url.render_as_string(hide_password=True)}')
+        with shard_router.use(department):
+            upgrade(revision=revision)
+
+
+@shards_cli.command('exec', context_settings={'ignore_unknown_options': True, 'allow_interspersed_args': False})
+@click.argument('department')
+@click.argument('args', nargs=-1, type=click.UNPROCESSED)
+@click.pass_context
+def exec_command(ctx, department, args):
+    """Run another flask command against DEPARTMENT's database.
+    
+    For example: flask shards exec CSE timetable import slots.csv
+    """
+    _require_sharding()
+    if department not in shard_router.departments:
+        raise click.BadParameter(f'{department} has no shard of its own', param_hint='DEPARTMENT')
+    
+    root = ctx.find_root()
+    with shard_router.use(department):
+        root.command.main(
+            args=list(args),
+            prog_name=f'{root.info_name} shards exec {department}',
+            obj=root.obj,
+            standalone_mode=False
+        )
@@ -0,0 +1,143 @@
+import csv
+import click
+from datetime import date, datetime, timedelta
+from flask.cli import AppGroup
+from sqlalchemy.exc import IntegrityError
+from app import db
+from models.user import User
+from models.timetable import TimetableSlot, Holiday
+from utils.subject_cache import subject_cache
+from utils.timetable import generate_sessions
+from utils.changes import release_day
+from utils.sharding import shard_router
+
+timetable_cli = AppGroup('timetable', help='Weekly timetable, holidays and session pre-generation.')
+
+WEEKDAYS = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+
+
+def _parse_weekday(value):
+    value = value.strip().lower()
+    if value.isdigit() and int(value) < 7:
+        return int(value)
+    if value[:3] in WEEKDAYS:
+        return WEEKDAYS.index(value[:3])
+    raise ValueError(f'Unknown weekday: {value}')
+
+
+@timetable_cli.command('generate')
+@click.option('--start', 'start_date', type=click.DateTime(formats=['%Y-%m-%d']), help='First day (default: tomorrow).')
+@click.option('--days', type=int, default=7, show_default=True, help='Number of days to generate.')
+@click.option('--status', 'default_status', type=click.Choice(['present', 'absent']), default='present',
+              show_default=True, help='Default attendance status for the pre-created rows.')
+@click.option('--dry-run', is_flag=True, help='Only report what would be created.')
+def generate_command(start_date, days, default_status, dry_run):
+    """Pre-create class sessions and default attendance from the timetable"""
+    start_date = start_date.date() if start_date else date.today() + timedelta(days=1)
+    end_date = start_date + timedelta(days=days - 1)
+    verb = 'would create' if dry_run else 'created'
+    
+    # Each shard has its own timetable
+    for key in shard_router.keys():
+        with shard_router.use(key):
+            counts = generate_sessions(start_date, end_date, default_status=default_status)
+            if dry_run:
+                db.session.rollback()
+            else:
+                # Today's pre-generated attendance goes out through the change feed
+                release_day(date.today())
+                db.session.commit()
+        
+        click.echo(
+            (f'{key or "main"}: ' if shard_router.enabled else '') +
+            f'{start_date} .. {end_date}: {verb} {counts["sessions_created"]} of {counts["sessions_planned"]} sessions '
+            f'and {counts["attendances_created"]} attendance records; {counts["holidays_skipped"]} skipped for holidays.'
+        )
+
+
+@timetable_cli.command('release')
+@click.option('--day', type=click.DateTime(formats=['%Y-%m-%d']), help='Day whose sessions started (default: today).')
+def release_command(day):
+    """Send a day's pre-generated attendance through the change feed.
+    
+    Run daily, shortly after midnight (generate does it for today too).
+    """
+    day = day.date() if day else date.today()
+    for key in shard_router.keys():
+        with shard_router.use(key):
+            released = release_day(day)
+            db.session.commit()
+        click.echo((f'{key or "main"}: ' if shard_router.enabled else '') + f'{day}: released {released} attendance records.')
+
+
+@timetable_cli.command('import')
+@click.argument('csv_file', type=click.File('r'))
+def import_command(csv_file):
+    """Add timetable slots from a CSV file.
+    
+    Columns: teacher_prn, subject, class, dept, division, weekday, start, end,
+    roll_start, roll_end. Weekdays are names (Mon) or numbers (0 = Monday),
+    times are HH:MM. Rows matching an existing slot are skipped.
+    """
+    teachers = {prn: user_id for prn, user_id in db.session.query(User.prn, User.id).filter(User.role == 'teacher')}
+    added = skipped = 0
+    
+    for line, row in enumerate(csv.DictReader(csv_file), start=2):
+        try:
+            teacher_id = teachers[row['teacher_prn']]
+        except KeyError:
+            raise click.ClickException(f'line {line}: no teacher with PRN {row["teacher_prn"]}')
+        try:
+            slot = TimetableSlot(
+                teacher_id=teacher_id,
+                subject_id=subject_cache.get_or_create(row['subject'], department=row['dept']),
+                class_name=row['class'],
+                department=row['dept'],
+                division=row.get('division') or None,
+                weekday=_parse_weekday(row['weekday']),
+                start_time=datetime.strptime(row['start'], '%H:%M').time(),
+                end_time=datetime.strptime(row['end'], '%H:%M').time(),
+                roll_start=int(row['roll_start']) if row.get('roll_start') else None,
+                roll_end=int(row['roll_end']) if row.get('roll_end') else None
+            )
+        except (KeyError, ValueError) as e:
+            raise click.ClickException(f'line {line}: {e}')
+        
+        try:
+            with db.session.begin_nested():
+                db.session.add(slot)
+            added += 1
+        except IntegrityError:
+            skipped += 1
+    
+    db.session.commit()
+    click.echo(f'Added {added} timetable slots ({skipped} already present).')
+
+
+@timetable_cli.command('holiday')
+@click.argument('day', type=click.DateTime(formats=['%Y-%m-%d']))
+@click.argument('name')
+@click.option('--dept', 'department', help='Only this department (default: whole college).')
+def holiday_command(day, name, department):
+    """Mark DAY as a holiday so no sessions are generated for it"""
+    holiday = Holiday.query.filter_by(date=day.date(), department=department).first()
+    if holiday:
+        holiday.name = name
+    else:
+        db.session.add(Holiday(date=day.date(), name=name, department=department))
+    db.session.commit()
+    click.echo(f'{day.date()}: {name} ({department or "all departments"}).')
+
+
+@timetable_cli.command('list')
+def list_command():
+    """Show the weekly timetable"""
+    slots = TimetableSlot.query.order_by(TimetableSlot.weekday, TimetableSlot.start_time).all()
+    if not slots:
+        click.echo('The timetable is empty.')
+    for slot in slots:
+        click.echo(
+            f'{WEEKDAYS[slot.weekday].title()} {slot.start_time:%H:%M}-{slot.end_time:%H:%M}  '
+            f'{slot.subject_name}  {slot.department} {slot.class_name}  {slot.teacher.prn}'
+            + ('' if slot.is_active is not False else '  (inactive)')
+        )
@@ -1,6 +1,16 @@
 import os
 from datetime import timedelta
 
+def _sse_max_connections():
+    """Live streams per process. Under sync/gthread workers every stream holds
+    a thread for its whole life, so at least one thread stays free for API
+    requests; only gevent workers may hold more streams than threads."""
+    threads = int(os.environ.get('SERVER_THREADS', 4))
+    requested = os.environ.get('SSE_MAX_CONNECTIONS')
+    if os.environ.get('SERVER_WORKER_CLASS') == 'gevent':
+        return int(requested or 500)
+    return max(0, min(int(requested or threads - 1), threads - 1))
+
 class Config:
     """Base configuration class"""
     SECRET_KEY = os.environ.get('SECRET_KEY', 'your-super-secret-key-change-this-in-production')
@@ -10,12 +20,88 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'sqlite:///markyou.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Archive of closed academic years (flask archive year <start year>).
+    # Set ARCHIVE_DATABASE_PATH to keep archived rows in a separate SQLite file.
+    ARCHIVE_DATABASE_PATH = os.environ.get('ARCHIVE_DATABASE_PATH')
+    ACADEMIC_YEAR_START_MONTH = int(os.environ.get('ACADEMIC_YEAR_START_MONTH', 6))
+    
+    # Sharding (utils/sharding.py): each department listed in SHARD_DEPARTMENTS
+    # gets its own database at SHARD_DATABASE_URL ({department} is lowercased);
+    # the others stay in the main database. Empty means a single database.
+    SHARD_DEPARTMENTS = [name.strip() for name in os.environ.get('SHARD_DEPARTMENTS', '').split(',') if name.strip()]
+    SHARD_DATABASE_URL = os.environ.get('SHARD_DATABASE_URL', 'sqlite:///markyou_{department}.db')
+    SHARD_FANOUT_WORKERS = int(os.environ.get('SHARD_FANOUT_WORKERS', 8))
+    
     # JWT Configuration
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
     
     # CORS Configuration
     CORS_ORIGINS = os.environ.get('CORS_ORIGINS', 'http://localhost:3000')
+    
+    # Rate limiting: {blueprint: (requests, seconds)} token buckets per user
+    # (or client IP when unauthenticated). Blueprints not listed are unlimited.
+    RATELIMIT_ENABLED = os.environ.get('RATELIMIT_ENABLED', 'true').lower() == 'true'
+    RATELIMIT_STORAGE_URL = os.environ.get('RATELIMIT_STORAGE_URL', 'memory://')
+    RATELIMIT_BUDGETS = {
+        'auth': (20, 60),  # per IP; raise it if students share a NAT
+        'dashboard': (60, 60)
+    }
+    # Per PRN named by login and password resets, on top of the IP budget
+    RATELIMIT_ACCOUNT_BUDGET = (10, 300)
+    
+    # Reverse proxies in front of the app whose X-Forwarded-For/-Proto headers
+    # are trusted (0: none, so request.remote_addr is the direct peer)
+    PROXY_FIX_X_FOR = int(os.environ.get('PROXY_FIX_X_FOR', 0))
+    PROXY_FIX_X_PROTO = int(os.environ.get('PROXY_FIX_X_PROTO', 0))
+    
+    # Response compression (br needs the optional brotli package)
+    COMPRESS_ENABLED = os.environ.get('COMPRESS_ENABLED', 'true').lower() == 'true'
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+    COMPRESS_MIMETYPES = ('application/json',)
+    COMPRESS_ALGORITHMS = ('br', 'gzip')
+    COMPRESS_GZIP_LEVEL = int(os.environ.get('COMPRESS_GZIP_LEVEL', 6))
+    COMPRESS_BR_LEVEL = int(os.environ.get('COMPRESS_BR_LEVEL', 4))
+    
+    # Live attendance feed (Server-Sent Events), limits are per process
+    SSE_MAX_CONNECTIONS = _sse_max_connections()
+    SSE_TOKEN_EXPIRES = timedelta(seconds=int(os.environ.get('SSE_TOKEN_EXPIRES_SECONDS', 60)))
+    SSE_HEARTBEAT_SECONDS = int(os.environ.get('SSE_HEARTBEAT_SECONDS', 15))
+    SSE_MAX_STREAM_SECONDS = int(os.environ.get('SSE_MAX_STREAM_SECONDS', 3600))
+    SSE_POLL_SECONDS = float(os.environ.get('SSE_POLL_SECONDS', 1))  # how soon other workers' updates arrive
+    
+    # Group commit: one writer thread per process batches attendance updates
+    GROUP_COMMIT_ENABLED = os.environ.get('GROUP_COMMIT_ENABLED', 'false').lower() == 'true'
+    GROUP_COMMIT_WINDOW_MS = float(os.environ.get('GROUP_COMMIT_WINDOW_MS', 5))
+    GROUP_COMMIT_MAX_BATCH = int(os.environ.get('GROUP_COMMIT_MAX_BATCH', 256))
+    GROUP_COMMIT_TIMEOUT_SECONDS = float(os.environ.get('GROUP_COMMIT_TIMEOUT_SECONDS', 10))
+    
+    # Most sessions accepted by one /api/attendance/record-batch request
+    BATCH_MAX_SESSIONS = int(os.environ.get('BATCH_MAX_SESSIONS', 50))
+    
+    # Token revocation: how stale another worker's revocation list may get
+    REVOCATION_REFRESH_SECONDS = float(os.environ.get('REVOCATION_REFRESH_SECONDS', 2))
+    
+    # On-demand profiling (utils/profiling.py): with it on, requests sent with
+    # ?profile=1 or X-Profile: 1 by these roles run under cProfile
+    PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'false').lower() == 'true'
+    PROFILING_ROLES = ('teacher',)
+    PROFILING_DIR = os.environ.get('PROFILING_DIR')  # default: <instance folder>/profiles
+    PROFILING_MAX_PROFILES = int(os.environ.get('PROFILING_MAX_PROFILES', 500))
+    
+    # Caches
+    ROSTER_CACHE_SIZE = int(os.environ.get('ROSTER_CACHE_SIZE', 256))
+    ROSTER_CACHE_CHECK_SECONDS = float(os.environ.get('ROSTER_CACHE_CHECK_SECONDS', 2))
+    
+    # Production server (gunicorn.conf.py)
+    SERVER_BIND = os.environ.get('SERVER_BIND', '0.0.0.0:5000')
+    SERVER_WORKERS = int(os.environ.get('SERVER_WORKERS', 2))
+    SERVER_THREADS = int(os.environ.get('SERVER_THREADS', 4))
+    SERVER_WORKER_CLASS = os.environ.get('SERVER_WORKER_CLASS')  # e.g. 'gevent' for many live streams
+    SERVER_MAX_REQUESTS = int(os.environ.get('SERVER_MAX_REQUESTS', 1000))
+    SERVER_MAX_REQUESTS_JITTER = int(os.environ.get('SERVER_MAX_REQUESTS_JITTER', 100))
+    SERVER_TIMEOUT = int(os.environ.get('SERVER_TIMEOUT', 30))
+    SERVER_GRACEFUL_TIMEOUT = int(os.environ.get('SERVER_GRACEFUL_TIMEOUT', 30))
 
 class DevelopmentConfig(Config):
     """Development configuration"""
@@ -31,6 +117,7 @@ class TestingConfig(Config):
     """Testing configuration"""
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    RATELIMIT_ENABLED = False
 
 # Configuration dictionary
 config = {
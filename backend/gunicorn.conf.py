@@ -0,0 +1,65 @@
+"""
+Gunicorn settings for the MarkYou API.
+
+Values come from config/config.py (and therefore from the environment):
+
+    SERVER_BIND                 address to listen on (0.0.0.0:5000)
+    SERVER_WORKERS              worker processes (2)
+    SERVER_THREADS              threads per worker (4)
+    SERVER_WORKER_CLASS         worker type (gthread/sync by default, gevent for many SSE streams)
+    SERVER_MAX_REQUESTS         recycle a worker after N requests (1000, 0 = never)
+    SERVER_MAX_REQUESTS_JITTER  random extra requests so workers don't recycle together
+    SERVER_TIMEOUT              seconds before a silent worker is killed
+    SERVER_GRACEFUL_TIMEOUT     seconds workers get to finish requests on shutdown
+"""
+import os
+import time
+
+from config.config import config as _configs
+
+_server_started = time.perf_counter()
+
+_settings = _configs[os.environ.get('FLASK_CONFIG', 'production')]
+
+bind = _settings.SERVER_BIND
+workers = _settings.SERVER_WORKERS
+threads = _settings.SERVER_THREADS
+worker_class = _settings.SERVER_WORKER_CLASS or ('gthread' if threads > 1 else 'sync')
+max_requests = _settings.SERVER_MAX_REQUESTS
+max_requests_jitter = _settings.SERVER_MAX_REQUESTS_JITTER
+timeout = _settings.SERVER_TIMEOUT
+graceful_timeout = _settings.SERVER_GRACEFUL_TIMEOUT
+
+# Build the app once in the master and fork workers from it
+preload_app = True
+
+accesslog = '-'
+errorlog = '-'
+# The default format logs the full request line; %(U)s is the path without
+# the query string, which may carry a stream token (?jwt=)
+access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(m)s %(U)s %(H)s" %(s)s %(b)s "%(f)s" "%(a)s"'
+
+
+def when_ready(server):
+    import wsgi
+    server.log.info(
+        'MarkYou API ready: app loaded in %.0f ms, server up in %.0f ms '
+        '(%d workers x %d threads, recycle after %d requests)',
+        wsgi.startup_seconds * 1000,
+        (time.perf_counter() - _server_started) * 1000,
+        workers, threads, max_requests
+    )
+
+
+def post_fork(server, worker):
+    # Connections opened in the master (during preload) must not be shared
+    # with forked workers
+    import wsgi
+    from app import db
+    with wsgi.app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+
+def worker_exit(server, worker):
+    server.log.info('Worker %s exited after finishing in-flight requests', worker.pid)
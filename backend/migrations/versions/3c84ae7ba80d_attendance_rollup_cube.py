@@ -0,0 +1,50 @@
+"""attendance rollup cube
+
+Revision ID: 3c84ae7ba80d
+Revises: eadab4a6dd1f
+Create Date: 2026-10-19 01:45:16.412824
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c84ae7ba80d'
+down_revision = 'eadab4a6dd1f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('attendance_rollups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('department', sa.String(length=100), nullable=False),
+    sa.Column('class_name', sa.String(length=50), nullable=False),
+    sa.Column('subject_id', sa.Integer(), nullable=False),
+    sa.Column('week_start', sa.Date(), nullable=False),
+    sa.Column('sessions', sa.Integer(), nullable=False),
+    sa.Column('total_records', sa.Integer(), nullable=False),
+    sa.Column('present', sa.Integer(), nullable=False),
+    sa.Column('absent', sa.Integer(), nullable=False),
+    sa.Column('late', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('department', 'class_name', 'subject_id', 'week_start', name='uq_attendance_rollups_cell')
+    )
+    with op.batch_alter_table('attendance_rollups', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_attendance_rollups_week_start'), ['week_start'], unique=False)
+
+    op.create_table('rollup_state',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('refreshed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('rollup_state')
+    with op.batch_alter_table('attendance_rollups', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_attendance_rollups_week_start'))
+
+    op.drop_table('attendance_rollups')
@@ -0,0 +1,56 @@
+"""normalize class session subjects onto the subjects catalog
+
+Revision ID: 7c2f4e91a0b3
+Revises: 3531b5739334
+Create Date: 2026-10-19 00:45:12.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c2f4e91a0b3'
+down_revision = '3531b5739334'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('class_sessions', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('subject_id', sa.Integer(), nullable=True))
+    
+    # Backfill: every distinct free-text subject becomes a catalog entry
+    op.execute("""
+        INSERT INTO subjects (name, department, is_active, created_at)
+        SELECT subject, MIN(department), 1, CURRENT_TIMESTAMP
+        FROM class_sessions
+        WHERE subject NOT IN (SELECT name FROM subjects)
+        GROUP BY subject
+    """)
+    op.execute("""
+        UPDATE class_sessions
+        SET subject_id = (SELECT subjects.id FROM subjects WHERE subjects.name = class_sessions.subject)
+    """)
+    
+    with op.batch_alter_table('class_sessions', schema=None) as batch_op:
+        batch_op.alter_column('subject_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_index(batch_op.f('ix_class_sessions_subject_id'), ['subject_id'], unique=False)
+        batch_op.create_foreign_key('fk_class_sessions_subject_id_subjects', 'subjects', ['subject_id'], ['id'])
+        batch_op.drop_column('subject')
+
+
+def downgrade():
+    with op.batch_alter_table('class_sessions', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('subject', sa.String(length=100), nullable=True))
+    
+    op.execute("""
+        UPDATE class_sessions
+        SET subject = (SELECT subjects.name FROM subjects WHERE subjects.id = class_sessions.subject_id)
+    """)
+    
+    with op.batch_alter_table('class_sessions', schema=None) as batch_op:
+        batch_op.alter_column('subject', existing_type=sa.String(length=100), nullable=False)
+        batch_op.drop_constraint('fk_class_sessions_subject_id_subjects', type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_class_sessions_subject_id'))
+        batch_op.drop_column('subject_id')
@@ -0,0 +1,60 @@
+"""timetable slots and holidays
+
+Revision ID: 9ffb5dad6256
+Revises: 2aadcaf042ed
+Create Date: 2026-10-19 00:58:02.450499
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9ffb5dad6256'
+down_revision = '2aadcaf042ed'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('holidays',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('department', sa.String(length=100), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('date', 'department', name='uq_holidays_date_department')
+    )
+    with op.batch_alter_table('holidays', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_holidays_date'), ['date'], unique=False)
+
+    op.create_table('timetable_slots',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('teacher_id', sa.Integer(), nullable=False),
+    sa.Column('subject_id', sa.Integer(), nullable=False),
+    sa.Column('class_name', sa.String(length=50), nullable=False),
+    sa.Column('department', sa.String(length=100), nullable=False),
+    sa.Column('division', sa.String(length=20), nullable=True),
+    sa.Column('weekday', sa.Integer(), nullable=False),
+    sa.Column('start_time', sa.Time(), nullable=False),
+    sa.Column('end_time', sa.Time(), nullable=False),
+    sa.Column('roll_start', sa.Integer(), nullable=True),
+    sa.Column('roll_end', sa.Integer(), nullable=True),
+    sa.Column('valid_from', sa.Date(), nullable=True),
+    sa.Column('valid_until', sa.Date(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['subject_id'], ['subjects.id'], ),
+    sa.ForeignKeyConstraint(['teacher_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('teacher_id', 'subject_id', 'class_name', 'weekday', 'start_time', name='uq_timetable_slots_slot')
+    )
+
+
+def downgrade():
+    op.drop_table('timetable_slots')
+    with op.batch_alter_table('holidays', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_holidays_date'))
+
+    op.drop_table('holidays')
@@ -0,0 +1,27 @@
+"""index attendances by class session
+
+Revision ID: a1c28eceea14
+Revises: aae588c6b458
+Create Date: 2026-10-19 00:49:05.152628
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1c28eceea14'
+down_revision = 'aae588c6b458'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('attendances', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_attendances_class_session_id'), ['class_session_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('attendances', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_attendances_class_session_id'))
+
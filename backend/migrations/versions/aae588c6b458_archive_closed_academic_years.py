@@ -0,0 +1,80 @@
+"""archive tables for closed academic years
+
+Revision ID: aae588c6b458
+Revises: d9a3c5b17e84
+Create Date: 2026-10-19 00:44:20.904321
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'aae588c6b458'
+down_revision = 'd9a3c5b17e84'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('attendances_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('class_session_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('recorded_at', sa.DateTime(), nullable=True),
+    sa.Column('recorded_by', sa.Integer(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    schema='archive'
+    )
+    with op.batch_alter_table('attendances_archive', schema='archive') as batch_op:
+        batch_op.create_index(batch_op.f('ix_archive_attendances_archive_class_session_id'), ['class_session_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_archive_attendances_archive_user_id'), ['user_id'], unique=False)
+
+    op.create_table('class_sessions_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('subject_id', sa.Integer(), nullable=False),
+    sa.Column('class_name', sa.String(length=50), nullable=False),
+    sa.Column('department', sa.String(length=100), nullable=False),
+    sa.Column('division', sa.String(length=20), nullable=True),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('start_time', sa.Time(), nullable=False),
+    sa.Column('end_time', sa.Time(), nullable=False),
+    sa.Column('teacher_id', sa.Integer(), nullable=False),
+    sa.Column('roll_start', sa.Integer(), nullable=True),
+    sa.Column('roll_end', sa.Integer(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    schema='archive'
+    )
+    with op.batch_alter_table('class_sessions_archive', schema='archive') as batch_op:
+        batch_op.create_index(batch_op.f('ix_archive_class_sessions_archive_date'), ['date'], unique=False)
+        batch_op.create_index(batch_op.f('ix_archive_class_sessions_archive_teacher_id'), ['teacher_id'], unique=False)
+
+    op.create_table('archived_years',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('academic_year', sa.String(length=20), nullable=False),
+    sa.Column('start_date', sa.Date(), nullable=False),
+    sa.Column('end_date', sa.Date(), nullable=False),
+    sa.Column('sessions_archived', sa.Integer(), nullable=True),
+    sa.Column('attendances_archived', sa.Integer(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('academic_year')
+    )
+
+
+def downgrade():
+    op.drop_table('archived_years')
+    with op.batch_alter_table('class_sessions_archive', schema='archive') as batch_op:
+        batch_op.drop_index(batch_op.f('ix_archive_class_sessions_archive_teacher_id'))
+        batch_op.drop_index(batch_op.f('ix_archive_class_sessions_archive_date'))
+
+    op.drop_table('class_sessions_archive', schema='archive')
+    with op.batch_alter_table('attendances_archive', schema='archive') as batch_op:
+        batch_op.drop_index(batch_op.f('ix_archive_attendances_archive_user_id'))
+        batch_op.drop_index(batch_op.f('ix_archive_attendances_archive_class_session_id'))
+
+    op.drop_table('attendances_archive', schema='archive')
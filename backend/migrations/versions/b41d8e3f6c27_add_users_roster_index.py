@@ -0,0 +1,26 @@
+"""add users roster index
+
+Revision ID: b41d8e3f6c27
+Revises: 7c2f4e91a0b3
+Create Date: 2026-10-19 01:02:40.551320
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b41d8e3f6c27'
+down_revision = '7c2f4e91a0b3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index('ix_users_roster', ['role', 'department', 'class_name'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index('ix_users_roster')
@@ -0,0 +1,80 @@
+"""unique class session slot and attendance per session
+
+Revision ID: d9a3c5b17e84
+Revises: b41d8e3f6c27
+Create Date: 2026-10-19 01:20:03.904117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd9a3c5b17e84'
+down_revision = 'b41d8e3f6c27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Collapse sessions duplicated by retried submissions. The newest copy
+    # is kept (it's the one whose id the client last received); attendance
+    # rows from the other copies are moved over only for students the kept
+    # session doesn't already have.
+    op.execute("""
+        CREATE TEMPORARY TABLE session_duplicates AS
+        SELECT cs.id AS old_id, slots.keep_id AS keep_id
+        FROM class_sessions cs
+        JOIN (
+            SELECT teacher_id, subject_id, class_name, date, start_time, MAX(id) AS keep_id
+            FROM class_sessions
+            GROUP BY teacher_id, subject_id, class_name, date, start_time
+            HAVING COUNT(*) > 1
+        ) slots
+            ON cs.teacher_id = slots.teacher_id
+            AND cs.subject_id = slots.subject_id
+            AND cs.class_name = slots.class_name
+            AND cs.date = slots.date
+            AND cs.start_time = slots.start_time
+            AND cs.id != slots.keep_id
+    """)
+    op.execute("""
+        UPDATE attendances
+        SET class_session_id = (
+            SELECT keep_id FROM session_duplicates WHERE old_id = attendances.class_session_id
+        )
+        WHERE class_session_id IN (SELECT old_id FROM session_duplicates)
+        AND NOT EXISTS (
+            SELECT 1 FROM attendances kept
+            WHERE kept.user_id = attendances.user_id
+            AND kept.class_session_id = (
+                SELECT keep_id FROM session_duplicates WHERE old_id = attendances.class_session_id
+            )
+        )
+    """)
+    op.execute("DELETE FROM attendances WHERE class_session_id IN (SELECT old_id FROM session_duplicates)")
+    op.execute("DELETE FROM class_sessions WHERE id IN (SELECT old_id FROM session_duplicates)")
+    op.execute("DROP TABLE session_duplicates")
+    
+    # Within a session keep the oldest row per student; that's the one
+    # /api/attendance/update has been modifying
+    op.execute("""
+        DELETE FROM attendances
+        WHERE id NOT IN (
+            SELECT MIN(id) FROM attendances GROUP BY user_id, class_session_id
+        )
+    """)
+    
+    with op.batch_alter_table('class_sessions', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_class_sessions_slot', ['teacher_id', 'subject_id', 'class_name', 'date', 'start_time'])
+    
+    with op.batch_alter_table('attendances', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_attendances_user_session', ['user_id', 'class_session_id'])
+
+
+def downgrade():
+    with op.batch_alter_table('attendances', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_attendances_user_session', type_='unique')
+    
+    with op.batch_alter_table('class_sessions', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_class_sessions_slot', type_='unique')
@@ -0,0 +1,78 @@
+"""attendance and session change versions
+
+Revision ID: eadab4a6dd1f
+Revises: f3b9d2a4c1e7
+Create Date: 2026-10-19 01:40:17.033578
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'eadab4a6dd1f'
+down_revision = 'f3b9d2a4c1e7'
+branch_labels = None
+depends_on = None
+
+
+# Same triggers as models.change_counter.version_triggers(), frozen here
+def version_triggers(table):
+    stamp = f"""
+        INSERT INTO change_counter (id, version) VALUES (1, 1)
+            ON CONFLICT (id) DO UPDATE SET version = version + 1;
+        UPDATE {table} SET version = (SELECT version FROM change_counter WHERE id = 1) WHERE id = new.id;
+    """
+    return [
+        f'CREATE TRIGGER {table}_version_insert AFTER INSERT ON {table} BEGIN {stamp} END',
+        f'CREATE TRIGGER {table}_version_update AFTER UPDATE ON {table} WHEN new.version IS old.version BEGIN {stamp} END'
+    ]
+
+
+def upgrade():
+    op.create_table('change_counter',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('attendances', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_attendances_version'), ['version'], unique=False)
+
+    with op.batch_alter_table('class_sessions', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_class_sessions_version'), ['version'], unique=False)
+
+    # Existing rows get distinct versions (sessions first) so a first sync
+    # can page through them, and the counter continues after them
+    op.execute('UPDATE class_sessions SET version = id')
+    op.execute('UPDATE attendances SET version = id + (SELECT COALESCE(MAX(id), 0) FROM class_sessions)')
+    op.execute("""
+        INSERT INTO change_counter (id, version)
+        SELECT 1, COALESCE(MAX(version), 0) FROM (
+            SELECT version FROM class_sessions UNION ALL SELECT version FROM attendances
+        ) AS versions
+    """)
+
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for table in ('attendances', 'class_sessions'):
+        for statement in version_triggers(table):
+            op.execute(statement)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        for table in ('attendances', 'class_sessions'):
+            for event in ('insert', 'update'):
+                op.execute(f'DROP TRIGGER IF EXISTS {table}_version_{event}')
+
+    with op.batch_alter_table('class_sessions', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_class_sessions_version'))
+        batch_op.drop_column('version')
+
+    with op.batch_alter_table('attendances', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_attendances_version'))
+        batch_op.drop_column('version')
+
+    op.drop_table('change_counter')
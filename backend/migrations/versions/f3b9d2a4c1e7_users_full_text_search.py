@@ -0,0 +1,52 @@
+"""users full-text search index
+
+Revision ID: f3b9d2a4c1e7
+Revises: 9ffb5dad6256
+Create Date: 2026-10-19 01:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3b9d2a4c1e7'
+down_revision = '9ffb5dad6256'
+branch_labels = None
+depends_on = None
+
+
+# Same objects as models.user.USERS_FTS_DDL, frozen here
+USERS_FTS_DDL = [
+    """CREATE VIRTUAL TABLE users_fts USING fts5(
+        name, prn, email,
+        content='users', content_rowid='id', prefix='2 3'
+    )""",
+    """CREATE TRIGGER users_fts_insert AFTER INSERT ON users BEGIN
+        INSERT INTO users_fts(rowid, name, prn, email) VALUES (new.id, new.name, new.prn, new.email);
+    END""",
+    """CREATE TRIGGER users_fts_delete AFTER DELETE ON users BEGIN
+        INSERT INTO users_fts(users_fts, rowid, name, prn, email) VALUES ('delete', old.id, old.name, old.prn, old.email);
+    END""",
+    """CREATE TRIGGER users_fts_update AFTER UPDATE OF name, prn, email ON users BEGIN
+        INSERT INTO users_fts(users_fts, rowid, name, prn, email) VALUES ('delete', old.id, old.name, old.prn, old.email);
+        INSERT INTO users_fts(rowid, name, prn, email) VALUES (new.id, new.name, new.prn, new.email);
+    END"""
+]
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for statement in USERS_FTS_DDL:
+        op.execute(statement)
+    # Index the users that already exist
+    op.execute("INSERT INTO users_fts(users_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for trigger in ('users_fts_insert', 'users_fts_delete', 'users_fts_update'):
+        op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+    op.execute('DROP TABLE IF EXISTS users_fts')
@@ -1,4 +1,9 @@
 from .user import User
 from .attendance import Attendance
 from .class_session import ClassSession
-from .subject import Subject 
\ No newline at end of file
+from .subject import Subject
+from .archive import ArchivedClassSession, ArchivedAttendance, ArchivedYear
+from .token_revocation import TokenRevocation
+from .timetable import TimetableSlot, Holiday
+from .change_counter import ChangeCounter
+from .rollup import AttendanceRollup, RollupState 
\ No newline at end of file
@@ -0,0 +1,136 @@
+from app import db
+from datetime import datetime
+
+# Archive tables live in the logical "archive" schema. utils/archive.py maps
+# it to the main database, or to an attached SQLite file when
+# ARCHIVE_DATABASE_PATH is set. SQLite can't enforce foreign keys across
+# attached files, so these tables declare none.
+ARCHIVE_SCHEMA = 'archive'
+
+
+class ArchivedClassSession(db.Model):
+    __tablename__ = 'class_sessions_archive'
+    __table_args__ = {'schema': ARCHIVE_SCHEMA}
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    subject_id = db.Column(db.Integer, nullable=False)
+    class_name = db.Column(db.String(50), nullable=False)
+    department = db.Column(db.String(100), nullable=False)
+    division = db.Column(db.String(20))
+    date = db.Column(db.Date, nullable=False, index=True)
+    start_time = db.Column(db.Time, nullable=False)
+    end_time = db.Column(db.Time, nullable=False)
+    teacher_id = db.Column(db.Integer, nullable=False, index=True)
+    roll_start = db.Column(db.Integer)
+    roll_end = db.Column(db.Integer)
+    is_active = db.Column(db.Boolean, default=True)
+    created_at = db.Column(db.DateTime)
+    
+    # Relationships
+    teacher = db.relationship(
+        'User',
+        primaryjoin='foreign(ArchivedClassSession.teacher_id) == User.id',
+        viewonly=True
+    )
+    
+    # Sparse fieldsets, see utils/fieldsets.py
+    COMPUTED_FIELDS = {'subject': ('subject_name', ('subject_id',))}
+    EXPANDABLE_FIELDS = ('teacher',)
+    
+    @property
+    def subject_name(self):
+        from utils.subject_cache import subject_cache
+        return subject_cache.name_for(self.subject_id)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'subject_id': self.subject_id,
+            'subject': self.subject_name,
+            'class_name': self.class_name,
+            'department': self.department,
+            'division': self.division,
+            'date': self.date.isoformat() if self.date else None,
+            'start_time': self.start_time.isoformat() if self.start_time else None,
+            'end_time': self.end_time.isoformat() if self.end_time else None,
+            'teacher_id': self.teacher_id,
+            'roll_start': self.roll_start,
+            'roll_end': self.roll_end,
+            'is_active': self.is_active,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'teacher': self.teacher.to_dict() if self.teacher else None
+        }
+    
+    def __repr__(self):
+        return f'<ArchivedClassSession {self.subject_name} - {self.class_name}>'
+
+
+class ArchivedAttendance(db.Model):
+    __tablename__ = 'attendances_archive'
+    __table_args__ = {'schema': ARCHIVE_SCHEMA}
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    user_id = db.Column(db.Integer, nullable=False, index=True)
+    class_session_id = db.Column(db.Integer, nullable=False, index=True)
+    status = db.Column(db.String(20))
+    recorded_at = db.Column(db.DateTime)
+    recorded_by = db.Column(db.Integer)
+    notes = db.Column(db.Text)
+    
+    # Relationships
+    user = db.relationship(
+        'User',
+        primaryjoin='foreign(ArchivedAttendance.user_id) == User.id',
+        viewonly=True
+    )
+    class_session = db.relationship(
+        'ArchivedClassSession',
+        primaryjoin='foreign(ArchivedAttendance.class_session_id) == ArchivedClassSession.id',
+        viewonly=True
+    )
+    
+    # Sparse fieldsets, see utils/fieldsets.py
+    EXPANDABLE_FIELDS = ('user', 'class_session')
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'class_session_id': self.class_session_id,
+            'status': self.status,
+            'recorded_at': self.recorded_at.isoformat() if self.recorded_at else None,
+            'recorded_by': self.recorded_by,
+            'notes': self.notes,
+            'user': self.user.to_dict() if self.user else None,
+            'class_session': self.class_session.to_dict() if self.class_session else None
+        }
+    
+    def __repr__(self):
+        return f'<ArchivedAttendance {self.user_id} - {self.status}>'
+
+
+class ArchivedYear(db.Model):
+    """An academic year whose sessions were moved to the archive tables"""
+    __tablename__ = 'archived_years'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    academic_year = db.Column(db.String(20), nullable=False, unique=True)  # e.g. '2023-24'
+    start_date = db.Column(db.Date, nullable=False)
+    end_date = db.Column(db.Date, nullable=False)
+    sessions_archived = db.Column(db.Integer, default=0)
+    attendances_archived = db.Column(db.Integer, default=0)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'academic_year': self.academic_year,
+            'start_date': self.start_date.isoformat() if self.start_date else None,
+            'end_date': self.end_date.isoformat() if self.end_date else None,
+            'sessions_archived': self.sessions_archived,
+            'attendances_archived': self.attendances_archived,
+            'archived_at': self.archived_at.isoformat() if self.archived_at else None
+        }
+    
+    def __repr__(self):
+        return f'<ArchivedYear {self.academic_year}>'
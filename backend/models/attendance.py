@@ -3,20 +3,27 @@ from datetime import datetime
 
 class Attendance(db.Model):
     __tablename__ = 'attendances'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'class_session_id', name='uq_attendances_user_session'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    class_session_id = db.Column(db.Integer, db.ForeignKey('class_sessions.id'), nullable=False)
+    class_session_id = db.Column(db.Integer, db.ForeignKey('class_sessions.id'), nullable=False, index=True)
     status = db.Column(db.String(20), default='present')  # 'present', 'absent', 'late'
     recorded_at = db.Column(db.DateTime, default=datetime.utcnow)
     recorded_by = db.Column(db.Integer, db.ForeignKey('users.id'))  # Teacher who recorded
     notes = db.Column(db.Text)
+    version = db.Column(db.Integer, index=True)  # change version, see models/change_counter.py
     
     # Relationships with explicit foreign keys
     user = db.relationship('User', foreign_keys=[user_id], backref='attendances')
-    class_session = db.relationship('ClassSession', backref='attendances')
+    class_session = db.relationship('ClassSession', back_populates='attendances')
     recorder = db.relationship('User', foreign_keys=[recorded_by], backref='recorded_attendances')
     
+    # Sparse fieldsets, see utils/fieldsets.py
+    EXPANDABLE_FIELDS = ('user', 'class_session')
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -26,6 +33,7 @@ class Attendance(db.Model):
             'recorded_at': self.recorded_at.isoformat() if self.recorded_at else None,
             'recorded_by': self.recorded_by,
             'notes': self.notes,
+            'version': self.version,
             'user': self.user.to_dict() if self.user else None,
             'class_session': self.class_session.to_dict() if self.class_session else None
         }
@@ -0,0 +1,45 @@
+from app import db
+from sqlalchemy import event, DDL
+from .attendance import Attendance
+from .class_session import ClassSession
+
+class ChangeCounter(db.Model):
+    """The last change version handed out in this database (a single row).
+    
+    Every insert or update of an attendance record or class session takes
+    the next version, so /api/attendance/changes can return what changed
+    after a client's cursor. Each shard counts on its own.
+    """
+    __tablename__ = 'change_counter'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False)
+    
+    def __repr__(self):
+        return f'<ChangeCounter {self.version}>'
+
+
+def version_triggers(table):
+    """Triggers stamping `table`'s rows with the next change version.
+    
+    They fire for every write, ORM or bulk Core (group commit, batches,
+    timetable generation, seeding, upserts), and writes are serialized in
+    SQLite, so versions become visible in order. The update trigger skips
+    its own stamping update.
+    """
+    stamp = f"""
+        INSERT INTO change_counter (id, version) VALUES (1, 1)
+            ON CONFLICT (id) DO UPDATE SET version = version + 1;
+        UPDATE {table} SET version = (SELECT version FROM change_counter WHERE id = 1) WHERE id = new.id;
+    """
+    return [
+        f'CREATE TRIGGER {table}_version_insert AFTER INSERT ON {table} BEGIN {stamp} END',
+        f'CREATE TRIGGER {table}_version_update AFTER UPDATE ON {table} WHEN new.version IS old.version BEGIN {stamp} END'
+    ]
+
+
+# Migration eadab4a6dd1f creates the same triggers; like the users search
+# index, a batch migration that recreates either table has to create them again
+for _table in (Attendance.__table__, ClassSession.__table__):
+    for _statement in version_triggers(_table.name):
+        event.listen(_table, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
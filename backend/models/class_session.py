@@ -3,9 +3,13 @@ from datetime import datetime
 
 class ClassSession(db.Model):
     __tablename__ = 'class_sessions'
+    __table_args__ = (
+        # One session per teacher/subject/class slot, so resubmitted records are idempotent
+        db.UniqueConstraint('teacher_id', 'subject_id', 'class_name', 'date', 'start_time', name='uq_class_sessions_slot'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
-    subject = db.Column(db.String(100), nullable=False)
+    subject_id = db.Column(db.Integer, db.ForeignKey('subjects.id'), nullable=False, index=True)
     class_name = db.Column(db.String(50), nullable=False)
     department = db.Column(db.String(100), nullable=False)
     division = db.Column(db.String(20))
@@ -17,14 +21,25 @@ class ClassSession(db.Model):
     roll_end = db.Column(db.Integer)
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    version = db.Column(db.Integer, index=True)  # change version, see models/change_counter.py
     
     # Relationships
-    attendances = db.relationship('Attendance', backref='class_session', lazy=True)
+    attendances = db.relationship('Attendance', back_populates='class_session', lazy=True)
+    
+    # Sparse fieldsets, see utils/fieldsets.py
+    COMPUTED_FIELDS = {'subject': ('subject_name', ('subject_id',))}
+    EXPANDABLE_FIELDS = ('teacher',)
+    
+    @property
+    def subject_name(self):
+        from utils.subject_cache import subject_cache
+        return subject_cache.name_for(self.subject_id)
     
     def to_dict(self):
         return {
             'id': self.id,
-            'subject': self.subject,
+            'subject_id': self.subject_id,
+            'subject': self.subject_name,
             'class_name': self.class_name,
             'department': self.department,
             'division': self.division,
@@ -36,8 +51,9 @@ class ClassSession(db.Model):
             'roll_end': self.roll_end,
             'is_active': self.is_active,
             'created_at': self.created_at.isoformat() if self.created_at else None,
+            'version': self.version,
             'teacher': self.teacher.to_dict() if self.teacher else None
         }
     
     def __repr__(self):
-        return f'<ClassSession {self.subject} - {self.class_name}>' 
\ No newline at end of file
+        return f'<ClassSession {self.subject_name} - {self.class_name}>' 
\ No newline at end of file
@@ -0,0 +1,39 @@
+from app import db
+from datetime import datetime
+
+class AttendanceRollup(db.Model):
+    """Attendance totals for one department, class, subject and week.
+    
+    Maintained by utils/rollups.py from the change versions of sessions and
+    attendance; analytics read these rows instead of the raw tables.
+    """
+    __tablename__ = 'attendance_rollups'
+    __table_args__ = (
+        db.UniqueConstraint('department', 'class_name', 'subject_id', 'week_start', name='uq_attendance_rollups_cell'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    department = db.Column(db.String(100), nullable=False)
+    class_name = db.Column(db.String(50), nullable=False)
+    subject_id = db.Column(db.Integer, nullable=False)
+    week_start = db.Column(db.Date, nullable=False, index=True)  # Monday
+    sessions = db.Column(db.Integer, nullable=False, default=0)
+    total_records = db.Column(db.Integer, nullable=False, default=0)
+    present = db.Column(db.Integer, nullable=False, default=0)
+    absent = db.Column(db.Integer, nullable=False, default=0)
+    late = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<AttendanceRollup {self.department} {self.class_name} {self.subject_id} {self.week_start}>'
+
+
+class RollupState(db.Model):
+    """Change version the rollups are current up to (a single row)"""
+    __tablename__ = 'rollup_state'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    refreshed_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<RollupState {self.version}>'
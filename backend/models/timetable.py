@@ -0,0 +1,90 @@
+from app import db
+from datetime import datetime
+
+class TimetableSlot(db.Model):
+    """A weekly lecture: pre-generated into ClassSessions by `flask timetable generate`"""
+    __tablename__ = 'timetable_slots'
+    __table_args__ = (
+        db.UniqueConstraint('teacher_id', 'subject_id', 'class_name', 'weekday', 'start_time', name='uq_timetable_slots_slot'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    teacher_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    subject_id = db.Column(db.Integer, db.ForeignKey('subjects.id'), nullable=False)
+    class_name = db.Column(db.String(50), nullable=False)
+    department = db.Column(db.String(100), nullable=False)
+    division = db.Column(db.String(20))
+    weekday = db.Column(db.Integer, nullable=False)  # 0 = Monday ... 6 = Sunday
+    start_time = db.Column(db.Time, nullable=False)
+    end_time = db.Column(db.Time, nullable=False)
+    roll_start = db.Column(db.Integer)
+    roll_end = db.Column(db.Integer)
+    valid_from = db.Column(db.Date)  # None = no bound
+    valid_until = db.Column(db.Date)
+    is_active = db.Column(db.Boolean, default=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    teacher = db.relationship('User')
+    
+    @property
+    def subject_name(self):
+        from utils.subject_cache import subject_cache
+        return subject_cache.name_for(self.subject_id)
+    
+    def runs_on(self, day):
+        return (
+            self.is_active is not False
+            and day.weekday() == self.weekday
+            and (self.valid_from is None or day >= self.valid_from)
+            and (self.valid_until is None or day <= self.valid_until)
+        )
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'teacher_id': self.teacher_id,
+            'subject_id': self.subject_id,
+            'subject': self.subject_name,
+            'class_name': self.class_name,
+            'department': self.department,
+            'division': self.division,
+            'weekday': self.weekday,
+            'start_time': self.start_time.isoformat() if self.start_time else None,
+            'end_time': self.end_time.isoformat() if self.end_time else None,
+            'roll_start': self.roll_start,
+            'roll_end': self.roll_end,
+            'valid_from': self.valid_from.isoformat() if self.valid_from else None,
+            'valid_until': self.valid_until.isoformat() if self.valid_until else None,
+            'is_active': self.is_active,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+    
+    def __repr__(self):
+        return f'<TimetableSlot {self.subject_name} - {self.class_name} day {self.weekday}>'
+
+
+class Holiday(db.Model):
+    """A day without lectures, college-wide or for one department"""
+    __tablename__ = 'holidays'
+    __table_args__ = (
+        db.UniqueConstraint('date', 'department', name='uq_holidays_date_department'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    date = db.Column(db.Date, nullable=False, index=True)
+    name = db.Column(db.String(100), nullable=False)
+    department = db.Column(db.String(100))  # None = whole college
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'date': self.date.isoformat() if self.date else None,
+            'name': self.name,
+            'department': self.department,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+    
+    def __repr__(self):
+        return f'<Holiday {self.date} {self.name}>'
@@ -0,0 +1,28 @@
+from app import db
+from datetime import datetime
+
+class TokenRevocation(db.Model):
+    """One bump of a user's token version (deactivation, password reset, ...).
+    
+    Rows are append-only, so workers can keep their revocation list current
+    by reading only ids above the last one they applied.
+    """
+    __tablename__ = 'token_revocations'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    token_version = db.Column(db.Integer, nullable=False)  # tokens below this version are rejected
+    reason = db.Column(db.String(50))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'token_version': self.token_version,
+            'reason': self.reason,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+    
+    def __repr__(self):
+        return f'<TokenRevocation {self.user_id} v{self.token_version}>'
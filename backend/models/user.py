@@ -1,9 +1,14 @@
 from app import db, bcrypt
 from datetime import datetime
+from sqlalchemy import event, DDL
 from sqlalchemy.ext.hybrid import hybrid_property
 
 class User(db.Model):
     __tablename__ = 'users'
+    __table_args__ = (
+        # Class roster lookups (role, department, class)
+        db.Index('ix_users_roster', 'role', 'department', 'class_name'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     prn = db.Column(db.String(20), unique=True, nullable=False)
@@ -14,12 +19,16 @@ class User(db.Model):
     class_name = db.Column(db.String(50))
     department = db.Column(db.String(100))
     is_active = db.Column(db.Boolean, default=True)
+    token_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # bumped to revoke issued tokens
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     class_sessions = db.relationship('ClassSession', backref='teacher', lazy=True)
     
+    # Sparse fieldsets, see utils/fieldsets.py
+    HIDDEN_FIELDS = ('password_hash', 'updated_at', 'token_version')
+    
     @hybrid_property
     def password(self):
         raise AttributeError('Password is not a readable attribute')
@@ -45,4 +54,31 @@ class User(db.Model):
         }
     
     def __repr__(self):
-        return f'<User {self.prn}>' 
\ No newline at end of file
+        return f'<User {self.prn}>'
+
+
+# Full-text index for /api/users/search (utils/user_search.py). It is an
+# external-content FTS5 table over users, so only the index is stored, and
+# triggers keep it in sync with every insert, update and delete, including
+# bulk Core writes. Migration f3b9d2a4c1e7 creates the same objects; a
+# batch migration that recreates the users table drops the triggers, so it
+# has to create them again.
+USERS_FTS_DDL = [
+    """CREATE VIRTUAL TABLE users_fts USING fts5(
+        name, prn, email,
+        content='users', content_rowid='id', prefix='2 3'
+    )""",
+    """CREATE TRIGGER users_fts_insert AFTER INSERT ON users BEGIN
+        INSERT INTO users_fts(rowid, name, prn, email) VALUES (new.id, new.name, new.prn, new.email);
+    END""",
+    """CREATE TRIGGER users_fts_delete AFTER DELETE ON users BEGIN
+        INSERT INTO users_fts(users_fts, rowid, name, prn, email) VALUES ('delete', old.id, old.name, old.prn, old.email);
+    END""",
+    """CREATE TRIGGER users_fts_update AFTER UPDATE OF name, prn, email ON users BEGIN
+        INSERT INTO users_fts(users_fts, rowid, name, prn, email) VALUES ('delete', old.id, old.name, old.prn, old.email);
+        INSERT INTO users_fts(rowid, name, prn, email) VALUES (new.id, new.name, new.prn, new.email);
+    END"""
+]
+
+for _statement in USERS_FTS_DDL:
+    event.listen(User.__table__, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
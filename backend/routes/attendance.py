@@ -1,14 +1,81 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, Response, current_app, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt, get_jwt_request_location, create_access_token
 from app import db
 from models.attendance import Attendance
 from models.class_session import ClassSession
 from models.user import User
+from models.archive import ArchivedAttendance, ArchivedClassSession
+from utils.archive import includes_archive
+from utils.subject_cache import subject_cache
+from utils.roster_cache import roster_cache
+from utils.sessions import upsert_class_session, insert_attendance_rows
+from utils.pubsub import attendance_feed, TooManySubscribers
+from utils.live_feed import attendance_watcher, feed_topic, session_counts
+from utils.metrics import metrics
+from utils.fieldsets import Fieldset, FieldsetError
+from utils.read_models import ReadModel
+from utils.group_commit import group_writer
+from utils.sharding import shard_router
+from utils.heatmap import AttendanceHeatmap, ENCODINGS
+from utils.changes import ChangeFeed, PAGE_SIZE, MAX_PAGE_SIZE
+from utils.revocation import stream_claims, STREAM_CLAIM
+from concurrent.futures import TimeoutError as FutureTimeout
 from datetime import datetime, date
-from sqlalchemy import and_
+from sqlalchemy import and_, func, select
+import json
+import queue
+import time
 
 attendance_bp = Blueprint('attendance', __name__)
 
+def _parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date() if value else None
+
+def _filter_by_session(query, session_model, start_date=None, end_date=None, subject=None, onclause=None):
+    """Apply date/subject filters through a join to the (hot or archived) session table"""
+    if not (start_date or end_date or subject):
+        return query
+    
+    query = query.join(session_model, onclause) if onclause is not None else query.join(session_model)
+    if start_date:
+        query = query.filter(session_model.date >= _parse_date(start_date))
+    if end_date:
+        query = query.filter(session_model.date <= _parse_date(end_date))
+    if subject:
+        # Unknown subjects resolve to None, which matches no session
+        query = query.filter(session_model.subject_id == subject_cache.id_for(subject))
+    return query
+
+SESSION_REQUIRED_FIELDS = ['subject', 'class', 'dept', 'date', 'timeStart', 'timeEnd', 'rollStart', 'rollEnd']
+ATTENDANCE_STATUSES = ('present', 'absent', 'late')
+
+def _missing_session_field(data):
+    for field in SESSION_REQUIRED_FIELDS:
+        if not data.get(field):
+            return field
+    return None
+
+def _foreign_department(data):
+    """Error message when the session's department lives in another shard"""
+    if not shard_router.owns(data['dept']):
+        return f'Sessions for {data["dept"]} must be recorded by a {data["dept"]} teacher'
+    return None
+
+def _session_values(data, teacher_id):
+    """ClassSession column values from a /record style request body"""
+    return {
+        'subject_id': subject_cache.get_or_create(data['subject'], department=data['dept']),
+        'class_name': data['class'],
+        'department': data['dept'],
+        'division': data.get('division'),
+        'date': datetime.strptime(data['date'], '%Y-%m-%d').date(),
+        'start_time': datetime.strptime(data['timeStart'], '%H:%M').time(),
+        'end_time': datetime.strptime(data['timeEnd'], '%H:%M').time(),
+        'teacher_id': teacher_id,
+        'roll_start': data['rollStart'],
+        'roll_end': data['rollEnd']
+    }
+
 @attendance_bp.route('/record', methods=['POST'])
 @jwt_required()
 def record_attendance():
@@ -23,61 +90,193 @@ def record_attendance():
         data = request.get_json()
         
         # Validate required fields
-        required_fields = ['subject', 'class', 'dept', 'date', 'timeStart', 'timeEnd', 'rollStart', 'rollEnd']
-        for field in required_fields:
-            if not data.get(field):
-                return jsonify({'error': f'{field} is required'}), 400
-        
-        # Create class session
-        class_session = ClassSession(
-            subject=data['subject'],
-            class_name=data['class'],
-            department=data['dept'],
-            division=data.get('division'),
-            date=datetime.strptime(data['date'], '%Y-%m-%d').date(),
-            start_time=datetime.strptime(data['timeStart'], '%H:%M').time(),
-            end_time=datetime.strptime(data['timeEnd'], '%H:%M').time(),
-            teacher_id=current_user_id,
-            roll_start=data['rollStart'],
-            roll_end=data['rollEnd']
-        )
+        missing = _missing_session_field(data)
+        if missing:
+            return jsonify({'error': f'{missing} is required'}), 400
+        foreign = _foreign_department(data)
+        if foreign:
+            return jsonify({'error': foreign}), 400
         
-        db.session.add(class_session)
-        db.session.flush()  # Get the ID without committing
+        # Create the class session, or find the one an earlier (retried)
+        # submission already created for this slot
+        session_id, created = upsert_class_session(_session_values(data, current_user_id))
         
         # Get students in the class
-        students = User.query.filter(
-            and_(
-                User.role == 'student',
-                User.class_name == data['class'],
-                User.department == data['dept']
-            )
-        ).all()
-        
-        # Create attendance records for all students
-        attendance_records = []
-        for student in students:
-            attendance = Attendance(
-                user_id=student.id,
-                class_session_id=class_session.id,
-                status='present',  # Default to present, can be updated later
-                recorded_by=current_user_id
-            )
-            attendance_records.append(attendance)
+        student_ids = roster_cache.get(
+            data['dept'],
+            data['class'],
+            data.get('division'),
+            data['rollStart'],
+            data['rollEnd']
+        )
         
-        db.session.add_all(attendance_records)
+        # Create attendance records for all students; on a retry only
+        # students missing from the session are added
+        insert_attendance_rows([
+            {
+                'user_id': student_id,
+                'class_session_id': session_id,
+                'status': 'present',  # Default to present, can be updated later
+                'recorded_by': current_user_id
+            }
+            for student_id in student_ids
+        ])
         db.session.commit()
         
+        class_session = ClassSession.query.get(session_id)
+        
+        if not created:
+            return jsonify({
+                'message': 'Attendance already recorded for this session',
+                'class_session': class_session.to_dict(),
+                'students_count': len(student_ids)
+            }), 200
+        
         return jsonify({
             'message': 'Attendance recorded successfully',
             'class_session': class_session.to_dict(),
-            'students_count': len(students)
+            'students_count': len(student_ids)
         }), 201
         
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+def _validate_batch_session(data):
+    """Error message for one /record-batch entry, or None if it is valid"""
+    if not isinstance(data, dict):
+        return 'each session must be an object'
+    missing = _missing_session_field(data)
+    if missing:
+        return f'{missing} is required'
+    foreign = _foreign_department(data)
+    if foreign:
+        return foreign
+    try:
+        datetime.strptime(data['date'], '%Y-%m-%d')
+        datetime.strptime(data['timeStart'], '%H:%M')
+        datetime.strptime(data['timeEnd'], '%H:%M')
+    except (TypeError, ValueError):
+        return 'date must be YYYY-MM-DD and times HH:MM'
+    overrides = data.get('overrides') or []
+    if not isinstance(overrides, list):
+        return 'overrides must be a list'
+    for override in overrides:
+        if (
+            not isinstance(override, dict)
+            or not isinstance(override.get('user_id'), int)
+            or override.get('status') not in ATTENDANCE_STATUSES
+        ):
+            return f'overrides need a user_id and a status in {", ".join(ATTENDANCE_STATUSES)}'
+    return None
+
+@attendance_bp.route('/record-batch', methods=['POST'])
+@jwt_required()
+def record_attendance_batch():
+    """Record attendance for many class sessions in one transaction.
+    
+    Each entry of `sessions` takes the /record fields plus optional
+    `overrides` ([{user_id, status, notes}]) for students who weren't
+    present. Sessions that already exist are reported and left as they are,
+    so a batch can be resubmitted safely. Either every session is written
+    or none is.
+    """
+    try:
+        current_user_id = get_jwt_identity()
+        teacher = User.query.get(current_user_id)
+        
+        if not teacher or teacher.role != 'teacher':
+            return jsonify({'error': 'Only teachers can record attendance'}), 403
+        
+        data = request.get_json(silent=True)
+        sessions = data.get('sessions') if isinstance(data, dict) else None
+        
+        if not sessions or not isinstance(sessions, list):
+            return jsonify({'error': 'sessions is required'}), 400
+        
+        max_sessions = current_app.config.get('BATCH_MAX_SESSIONS', 50)
+        if len(sessions) > max_sessions:
+            return jsonify({'error': f'At most {max_sessions} sessions per batch'}), 400
+        
+        # Reject the whole batch before writing anything
+        for index, session_data in enumerate(sessions):
+            error = _validate_batch_session(session_data)
+            if error:
+                return jsonify({'error': error, 'index': index}), 400
+        
+        rosters = {}
+        rows = []
+        queued = set()  # (session, student) pairs already in rows
+        results = []
+        for session_data in sessions:
+            session_id, created = upsert_class_session(_session_values(session_data, current_user_id))
+            
+            # Each roster is resolved once per batch
+            roster_key = (
+                session_data['dept'],
+                session_data['class'],
+                session_data.get('division'),
+                session_data['rollStart'],
+                session_data['rollEnd']
+            )
+            if roster_key not in rosters:
+                rosters[roster_key] = roster_cache.get(*roster_key)
+            student_ids = rosters[roster_key]
+            
+            overrides = {override['user_id']: override for override in session_data.get('overrides') or ()}
+            roster = set(student_ids)
+            
+            # Existing sessions only gain missing students, with their
+            # overridden status; rows already there are not touched
+            recorded = set()
+            if not created and overrides.keys() & roster:
+                recorded = set(db.session.execute(
+                    select(Attendance.user_id).where(
+                        Attendance.class_session_id == session_id,
+                        Attendance.user_id.in_(overrides.keys() & roster)
+                    )
+                ).scalars())
+            
+            overrides_applied = 0
+            for student_id in student_ids:
+                if (session_id, student_id) in queued or student_id in recorded:
+                    continue
+                queued.add((session_id, student_id))
+                override = overrides.get(student_id, {})
+                if student_id in overrides:
+                    overrides_applied += 1
+                rows.append({
+                    'user_id': student_id,
+                    'class_session_id': session_id,
+                    'status': override.get('status', 'present'),
+                    'notes': override.get('notes'),
+                    'recorded_by': current_user_id
+                })
+            
+            results.append({
+                'class_session_id': session_id,
+                'created': created,
+                'students_count': len(student_ids),
+                'overrides_applied': overrides_applied,
+                'unknown_students': sorted(overrides.keys() - roster)
+            })
+        
+        with metrics.timer('attendance.record_batch.insert'):
+            inserted = insert_attendance_rows(rows)
+        db.session.commit()
+        metrics.incr('attendance.record_batch.sessions', len(sessions))
+        
+        created_count = sum(1 for result in results if result['created'])
+        return jsonify({
+            'message': f'Recorded {created_count} of {len(results)} sessions',
+            'results': results,
+            'attendances_inserted': inserted
+        }), 201 if created_count else 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
 @attendance_bp.route('/update', methods=['PUT'])
 @jwt_required()
 def update_attendance():
@@ -102,17 +301,42 @@ def update_attendance():
             return jsonify({'error': 'You can only update attendance for your own classes'}), 403
         
         # Update attendance records
-        for update in data['attendance_updates']:
-            attendance = Attendance.query.filter_by(
-                user_id=update['user_id'],
-                class_session_id=data['class_session_id']
-            ).first()
-            
-            if attendance:
+        updates = {update['user_id']: update for update in data['attendance_updates']}
+        attendances = Attendance.query.filter(
+            Attendance.class_session_id == class_session.id,
+            Attendance.user_id.in_(updates.keys())
+        ).all()
+        
+        rows = []
+        for attendance in attendances:
+            update = updates[attendance.user_id]
+            if attendance.status != update['status'] or attendance.notes != update.get('notes'):
+                rows.append({'id': attendance.id, 'status': update['status'], 'notes': update.get('notes')})
+        
+        if group_writer.enabled:
+            # End the read transaction; the writer thread commits the rows
+            # together with other requests' and resolves once they're durable
+            db.session.rollback()
+            if rows:
+                try:
+                    group_writer.submit(rows).result(timeout=group_writer.timeout)
+                except FutureTimeout:
+                    # Still queued or being written: it may yet commit. Setting
+                    # statuses is idempotent, so the client can simply retry.
+                    metrics.incr('group_commit.timeouts')
+                    response = jsonify({
+                        'error': 'Attendance update not confirmed in time; its outcome is unknown, please retry',
+                        'outcome': 'unknown'
+                    })
+                    response.status_code = 503
+                    response.headers['Retry-After'] = '1'
+                    return response
+        else:
+            for attendance in attendances:
+                update = updates[attendance.user_id]
                 attendance.status = update['status']
                 attendance.notes = update.get('notes')
-        
-        db.session.commit()
+            db.session.commit()
         
         return jsonify({
             'message': 'Attendance updated successfully'
@@ -155,13 +379,130 @@ def get_session_attendance(session_id):
             if class_session.teacher_id != current_user_id:
                 return jsonify({'error': 'Access denied'}), 403
             
-            attendances = Attendance.query.filter_by(class_session_id=session_id).all()
+            fieldset = Fieldset.from_request(Attendance)
+            reader = ReadModel(fieldset)
+            attendances = reader.all(reader.select().where(Attendance.class_session_id == session_id))
             
             return jsonify({
                 'class_session': class_session.to_dict(),
-                'attendances': [att.to_dict() for att in attendances]
+                'attendances': fieldset.serialize_all(attendances)
             }), 200
         
+    except FieldsetError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def _sse_event(event, data):
+    return f'event: {event}\ndata: {json.dumps(data)}\n\n'
+
+def _attendance_event_stream(subscription, session_id, counts, heartbeat_seconds, max_seconds):
+    """Yield a snapshot of the counts, then each published delta"""
+    try:
+        yield _sse_event('snapshot', {'class_session_id': session_id, 'counts': counts})
+        
+        deadline = time.monotonic() + max_seconds
+        while time.monotonic() < deadline:
+            try:
+                message = subscription.get(timeout=heartbeat_seconds)
+            except queue.Empty:
+                # Keeps proxies from closing the connection and detects clients that left
+                yield ': keep-alive\n\n'
+                continue
+            
+            if subscription.overflowed:
+                # Deltas were dropped; the client should re-fetch the session
+                subscription.overflowed = False
+                yield _sse_event('resync', {'class_session_id': session_id})
+            yield _sse_event('update', message)
+    finally:
+        subscription.close()
+
+@attendance_bp.route('/session/<int:session_id>/stream-token', methods=['POST'])
+@jwt_required()
+def create_stream_token(session_id):
+    """Short-lived token for ?jwt= on the session's live stream.
+    
+    It opens only this session's stream, so a copy left in a proxy or
+    access log is of no use elsewhere and soon expires.
+    """
+    try:
+        current_user_id = get_jwt_identity()
+        user = User.query.get(current_user_id)
+        
+        class_session = ClassSession.query.get(session_id)
+        if not class_session:
+            return jsonify({'error': 'Class session not found'}), 404
+        
+        if not user or user.role != 'teacher' or class_session.teacher_id != current_user_id:
+            return jsonify({'error': 'Access denied'}), 403
+        
+        expires = current_app.config['SSE_TOKEN_EXPIRES']
+        return jsonify({
+            'stream_token': create_access_token(
+                identity=user.id,
+                additional_claims=stream_claims(user, session_id),
+                expires_delta=expires
+            ),
+            'expires_in': int(expires.total_seconds())
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@attendance_bp.route('/session/<int:session_id>/stream', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])
+def stream_session_attendance(session_id):
+    """Server-Sent Events feed of attendance changes for a live session.
+    
+    EventSource can't send headers, so the token may also be passed as
+    ?jwt=<stream token> (from POST .../stream-token; regular access tokens
+    are only accepted in the header). Sends a `snapshot` event with the
+    current counts, then an `update` event with only the changed records
+    and new counts each time attendance for the session is updated.
+    """
+    try:
+        if get_jwt_request_location() == 'query_string' and STREAM_CLAIM not in get_jwt():
+            return jsonify({'error': 'Use a stream token in the query string'}), 401
+        
+        current_user_id = get_jwt_identity()
+        user = User.query.get(current_user_id)
+        
+        class_session = ClassSession.query.get(session_id)
+        if not class_session:
+            return jsonify({'error': 'Class session not found'}), 404
+        
+        if not user or user.role != 'teacher' or class_session.teacher_id != current_user_id:
+            return jsonify({'error': 'Access denied'}), 403
+        
+        try:
+            subscription = attendance_feed.subscribe(feed_topic(session_id), current_app.config['SSE_MAX_CONNECTIONS'])
+        except TooManySubscribers:
+            metrics.incr('sse.rejected')
+            return jsonify({'error': 'Too many live connections, please poll instead'}), 503
+        
+        # Subscribed (and watched) before taking the snapshot, so no update
+        # falls in between
+        try:
+            attendance_watcher.watch()
+            counts = session_counts(session_id)
+        except Exception:
+            subscription.close()
+            raise
+        
+        metrics.incr('sse.connections')
+        stream = _attendance_event_stream(
+            subscription,
+            session_id,
+            counts,
+            current_app.config['SSE_HEARTBEAT_SECONDS'],
+            current_app.config['SSE_MAX_STREAM_SECONDS']
+        )
+        return Response(stream, mimetype='text/event-stream', headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        })
+        
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -181,27 +522,148 @@ def get_student_attendance(student_id):
         if not student or student.role != 'student':
             return jsonify({'error': 'Student not found'}), 404
         
-        # Get query parameters for filtering
+        # Get query parameters for filtering; sessions after today only hold
+        # pre-generated defaults, not attendance
         start_date = request.args.get('start_date')
-        end_date = request.args.get('end_date')
+        end_date = min(_parse_date(request.args.get('end_date')) or date.today(), date.today()).isoformat()
         subject = request.args.get('subject')
         
-        query = Attendance.query.filter_by(user_id=student_id)
+        # recorded_at is always selected: hot and archived rows are merged on it
+        fieldset = Fieldset.from_request(Attendance, extra_columns=('recorded_at',))
         
-        if start_date:
-            query = query.join(ClassSession).filter(ClassSession.date >= start_date)
-        if end_date:
-            query = query.join(ClassSession).filter(ClassSession.date <= end_date)
-        if subject:
-            query = query.join(ClassSession).filter(ClassSession.subject == subject)
-        
-        attendances = query.order_by(Attendance.recorded_at.desc()).all()
+        reader = ReadModel(fieldset)
+        query = _filter_by_session(
+            reader.select().where(Attendance.user_id == student_id),
+            ClassSession, start_date, end_date, subject
+        )
+        attendances = reader.all(query.order_by(Attendance.recorded_at.desc()))
+        records = fieldset.serialize_all(attendances)
+        
+        # Reach into archived academic years only when the range needs it
+        if includes_archive(_parse_date(start_date)):
+            archived_fieldset = Fieldset.from_request(ArchivedAttendance, extra_columns=('recorded_at',))
+            archived_reader = ReadModel(archived_fieldset)
+            archived_query = _filter_by_session(
+                archived_reader.select().where(ArchivedAttendance.user_id == student_id),
+                ArchivedClassSession, start_date, end_date, subject,
+                onclause=ArchivedAttendance.class_session_id == ArchivedClassSession.id
+            )
+            archived = archived_reader.all(archived_query.order_by(ArchivedAttendance.recorded_at.desc()))
+            merged = [(att, fieldset) for att in attendances] + [(att, archived_fieldset) for att in archived]
+            merged.sort(key=lambda pair: pair[0].recorded_at or datetime.min, reverse=True)
+            records = [rowset.serialize(att) for att, rowset in merged]
         
         return jsonify({
             'student': student.to_dict(),
-            'attendances': [att.to_dict() for att in attendances]
+            'attendances': records
         }), 200
         
+    except FieldsetError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@attendance_bp.route('/heatmap', methods=['GET'])
+@jwt_required()
+def get_attendance_heatmap():
+    """A class's attendance as a compact students x dates grid (teachers only)
+    
+    Query: class, dept (required), start_date, end_date, subject, and
+    encoding=base64 (default) or rle. The grid holds one code per cell,
+    indexed by `legend`, row major.
+    """
+    try:
+        current_user_id = get_jwt_identity()
+        user = User.query.get(current_user_id)
+        if not user or user.role != 'teacher':
+            return jsonify({'error': 'Only teachers can view class heatmaps'}), 403
+        
+        class_name = request.args.get('class')
+        department = request.args.get('dept')
+        if not class_name or not department:
+            return jsonify({'error': 'class and dept are required'}), 400
+        if not shard_router.owns(department):
+            return jsonify({'error': f'{department} attendance lives in another database'}), 400
+        encoding = request.args.get('encoding', ENCODINGS[0])
+        if encoding not in ENCODINGS:
+            return jsonify({'error': f'encoding must be one of {", ".join(ENCODINGS)}'}), 400
+        
+        start_date = _parse_date(request.args.get('start_date'))
+        # Pre-generated future sessions already have attendance rows
+        end_date = min(_parse_date(request.args.get('end_date')) or date.today(), date.today())
+        subject = request.args.get('subject')
+        
+        def criteria(session_model):
+            clauses = [
+                session_model.class_name == class_name,
+                session_model.department == department,
+                session_model.date <= end_date
+            ]
+            if start_date:
+                clauses.append(session_model.date >= start_date)
+            if subject:
+                clauses.append(session_model.subject_id == subject_cache.id_for(subject))
+            return clauses
+        
+        archived = (ArchivedAttendance, ArchivedClassSession) if includes_archive(start_date) else None
+        heatmap = AttendanceHeatmap((Attendance, ClassSession), archived).build(criteria, encoding)
+        
+        return jsonify({'class': class_name, 'dept': department, **heatmap}), 200
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@attendance_bp.route('/changes', methods=['GET'])
+@jwt_required()
+def get_changes():
+    """Sessions and attendance written after ?since=<cursor>, for offline sync
+    
+    Start with since=0 and pass back the returned cursor; keep calling while
+    has_more is true. Teachers get their sessions and those sessions'
+    attendance; students get their own attendance, with its session
+    embedded, and updates to those sessions. Rows are flat, without the
+    nested users of the other endpoints.
+    """
+    try:
+        current_user_id = get_jwt_identity()
+        user = User.query.get(current_user_id)
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        try:
+            since = int(request.args.get('since', 0))
+            limit = min(int(request.args.get('limit', PAGE_SIZE)), MAX_PAGE_SIZE)
+        except ValueError:
+            return jsonify({'error': 'since and limit must be integers'}), 400
+        if since < 0 or limit < 1:
+            return jsonify({'error': 'since must be >= 0 and limit >= 1'}), 400
+        
+        # Attendance of sessions after today is only pre-generated defaults;
+        # it is re-stamped (and so sent) when its day comes, see release_day()
+        held_sessions = select(ClassSession.id).where(ClassSession.date > date.today())
+        if user.role == 'teacher':
+            own_sessions = select(ClassSession.id).where(ClassSession.teacher_id == current_user_id)
+            sources = {
+                'sessions': (Fieldset(ClassSession, None, []), [ClassSession.teacher_id == current_user_id]),
+                'attendances': (Fieldset(Attendance, None, []), [
+                    Attendance.class_session_id.in_(own_sessions),
+                    Attendance.class_session_id.not_in(held_sessions)
+                ])
+            }
+        else:
+            attended = select(Attendance.class_session_id).where(Attendance.user_id == current_user_id)
+            sources = {
+                'sessions': (Fieldset(ClassSession, None, []), [ClassSession.id.in_(attended)]),
+                'attendances': (Fieldset(Attendance, None, ['class_session']), [
+                    Attendance.user_id == current_user_id,
+                    Attendance.class_session_id.not_in(held_sessions)
+                ])
+            }
+        
+        return jsonify(ChangeFeed(sources).since(since, limit)), 200
+        
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -213,23 +675,29 @@ def get_attendance_analytics():
         current_user_id = get_jwt_identity()
         user = User.query.get(current_user_id)
         
-        # Get query parameters
+        # Get query parameters; sessions after today only have the
+        # pre-generated default attendance (utils/timetable.py)
         start_date = request.args.get('start_date')
-        end_date = request.args.get('end_date')
+        end_date = min(_parse_date(request.args.get('end_date')) or date.today(), date.today()).isoformat()
         class_name = request.args.get('class')
         department = request.args.get('dept')
         
         if user.role == 'student':
             # Student analytics
-            query = Attendance.query.filter_by(user_id=current_user_id)
-            
-            if start_date:
-                query = query.join(ClassSession).filter(ClassSession.date >= start_date)
-            if end_date:
-                query = query.join(ClassSession).filter(ClassSession.date <= end_date)
-            
+            query = _filter_by_session(
+                Attendance.query.filter_by(user_id=current_user_id),
+                ClassSession, start_date, end_date
+            )
             attendances = query.all()
             
+            if includes_archive(_parse_date(start_date)):
+                archived_query = _filter_by_session(
+                    ArchivedAttendance.query.filter_by(user_id=current_user_id),
+                    ArchivedClassSession, start_date, end_date,
+                    onclause=ArchivedAttendance.class_session_id == ArchivedClassSession.id
+                )
+                attendances.extend(archived_query.all())
+            
             total_sessions = len(attendances)
             present_count = len([a for a in attendances if a.status == 'present'])
             absent_count = len([a for a in attendances if a.status == 'absent'])
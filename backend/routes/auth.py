@@ -1,7 +1,9 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity, get_jwt
 from app import db
 from models.user import User
+from utils.revocation import revoke_tokens, token_claims, refreshed_claims
+from utils.sharding import shard_router
 from datetime import datetime
 import re
 
@@ -24,13 +26,16 @@ def register():
         if not re.match(email_pattern, data['email']):
             return jsonify({'error': 'Invalid email format'}), 400
         
-        # Check if user already exists
-        if User.query.filter_by(prn=data['prn']).first():
+        # Check if user already exists, in any department's database
+        if shard_router.exists(User.prn == data['prn']):
             return jsonify({'error': 'PRN already registered'}), 409
         
-        if User.query.filter_by(email=data['email']).first():
+        if shard_router.exists(User.email == data['email']):
             return jsonify({'error': 'Email already registered'}), 409
         
+        # New users go to their department's database
+        shard_router.route(shard_router.key_for(data['dept']))
+        
         # Create new user
         user = User(
             prn=data['prn'],
@@ -63,6 +68,7 @@ def login():
         if not data.get('prn') or not data.get('password'):
             return jsonify({'error': 'PRN and password are required'}), 400
         
+        shard_router.route(shard_router.locate(User.prn == data['prn']))
         user = User.query.filter_by(prn=data['prn']).first()
         
         if not user or not user.verify_password(data['password']):
@@ -72,8 +78,9 @@ def login():
             return jsonify({'error': 'Account is deactivated'}), 401
         
         # Create tokens
-        access_token = create_access_token(identity=user.id)
-        refresh_token = create_refresh_token(identity=user.id)
+        claims = token_claims(user)
+        access_token = create_access_token(identity=user.id, additional_claims=claims)
+        refresh_token = create_refresh_token(identity=user.id, additional_claims=claims)
         
         return jsonify({
             'message': 'Login successful',
@@ -91,7 +98,11 @@ def refresh():
     """Refresh access token"""
     try:
         current_user_id = get_jwt_identity()
-        access_token = create_access_token(identity=current_user_id)
+        # Same version (and shard) as the refresh token, which the blocklist check just accepted
+        access_token = create_access_token(
+            identity=current_user_id,
+            additional_claims=refreshed_claims(get_jwt())
+        )
         
         return jsonify({
             'access_token': access_token
@@ -127,6 +138,7 @@ def forgot_password():
         if not data.get('prn') or not data.get('email'):
             return jsonify({'error': 'PRN and email are required'}), 400
         
+        shard_router.route(shard_router.locate(User.prn == data['prn'], User.email == data['email']))
         user = User.query.filter_by(prn=data['prn'], email=data['email']).first()
         
         if not user:
@@ -151,12 +163,14 @@ def reset_password():
         if not data.get('prn') or not data.get('password'):
             return jsonify({'error': 'PRN and new password are required'}), 400
         
+        shard_router.route(shard_router.locate(User.prn == data['prn']))
         user = User.query.filter_by(prn=data['prn']).first()
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
         user.password = data['password']
+        revoke_tokens(user, 'password_reset')
         db.session.commit()
         
         return jsonify({
@@ -4,11 +4,369 @@ from app import db
 from models.user import User
 from models.attendance import Attendance
 from models.class_session import ClassSession
+from models.archive import ArchivedAttendance, ArchivedClassSession
+from utils.archive import includes_archive
+from utils.subject_cache import subject_cache
+from utils.fieldsets import Fieldset, FieldsetError
+from utils.read_models import ReadModel
+from utils.sharding import shard_router
+from utils.rollups import rollup_cube, week_start, week_end, DIMENSIONS, COUNTERS
 from datetime import datetime, date, timedelta
+from collections import namedtuple
 from sqlalchemy import func, and_
 
 dashboard_bp = Blueprint('dashboard', __name__)
 
+# One aggregated group of attendance rows: (session,) date, subject and status
+AttendanceBucket = namedtuple('AttendanceBucket', 'session_id date subject_id status count')
+
+def _date_range():
+    """Requested date range (default to last 30 days)"""
+    end_date = date.today()
+    start_date = end_date - timedelta(days=30)
+    
+    if request.args.get('start_date'):
+        start_date = datetime.strptime(request.args.get('start_date'), '%Y-%m-%d').date()
+    if request.args.get('end_date'):
+        end_date = datetime.strptime(request.args.get('end_date'), '%Y-%m-%d').date()
+    
+    return start_date, end_date
+
+def _subject_window_start():
+    """Subject analysis always covers the last 30 days"""
+    return date.today() - timedelta(days=30)
+
+def _session_sources(since):
+    """(attendance model, session model) pairs a range starting at `since` reads"""
+    sources = [(Attendance, ClassSession)]
+    if includes_archive(since):
+        sources.append((ArchivedAttendance, ArchivedClassSession))
+    return sources
+
+def _attendance_buckets(user, since, until=None):
+    """Scan the user's attendance once, grouped into AttendanceBuckets.
+    
+    Students get one bucket per (date, subject, status). Teachers get one per
+    (session, status), outer joined so sessions without attendance still
+    count as sessions (with status None and count 0). Archived years are
+    scanned too when the range reaches them. Nothing after today is
+    scanned: timetable generation pre-creates attendance for future sessions.
+    """
+    until = date.today() if until is None else min(until, date.today())
+    buckets = []
+    for attendance_model, session_model in _session_sources(since):
+        if user.role == 'student':
+            query = db.session.query(
+                session_model.date,
+                session_model.subject_id,
+                attendance_model.status,
+                func.count(attendance_model.id)
+            ).join(attendance_model, attendance_model.class_session_id == session_model.id).filter(
+                attendance_model.user_id == user.id,
+                session_model.date.between(since, until)
+            )
+            rows = query.group_by(session_model.date, session_model.subject_id, attendance_model.status).all()
+            buckets.extend(AttendanceBucket(None, *row) for row in rows)
+            continue
+        
+        query = db.session.query(
+            session_model.id,
+            session_model.date,
+            session_model.subject_id,
+            attendance_model.status,
+            func.count(attendance_model.id)
+        ).outerjoin(attendance_model, attendance_model.class_session_id == session_model.id).filter(
+            session_model.teacher_id == user.id,
+            session_model.date.between(since, until)
+        )
+        rows = query.group_by(
+            session_model.id, session_model.date, session_model.subject_id, attendance_model.status
+        ).all()
+        buckets.extend(AttendanceBucket(*row) for row in rows)
+    return buckets
+
+def _build_stats(user, buckets, start_date, end_date):
+    buckets = [bucket for bucket in buckets if start_date <= bucket.date <= end_date]
+    
+    def count_status(status):
+        return sum(bucket.count for bucket in buckets if bucket.status == status)
+    
+    if user.role == 'student':
+        # Student dashboard stats
+        total_sessions = sum(bucket.count for bucket in buckets)
+        present_count = count_status('present')
+        absent_count = count_status('absent')
+        late_count = count_status('late')
+        
+        attendance_percentage = (present_count / total_sessions * 100) if total_sessions > 0 else 0
+        
+        # Get recent attendance
+        fieldset = Fieldset.from_request(Attendance)
+        reader = ReadModel(fieldset)
+        recent_attendances = reader.all(reader.select().join(ClassSession).filter(
+            and_(
+                Attendance.user_id == user.id,
+                ClassSession.date.between(end_date - timedelta(days=7), date.today())
+            )
+        ).order_by(ClassSession.date.desc()).limit(5))
+        
+        return {
+            'total_sessions': total_sessions,
+            'present': present_count,
+            'absent': absent_count,
+            'late': late_count,
+            'attendance_percentage': round(attendance_percentage, 2),
+            'recent_attendances': fieldset.serialize_all(recent_attendances),
+            'warning': attendance_percentage < 75
+        }
+    
+    # Teacher dashboard stats
+    total_sessions = len({bucket.session_id for bucket in buckets})
+    total_students = sum(bucket.count for bucket in buckets)
+    total_present = count_status('present')
+    total_absent = count_status('absent')
+    
+    avg_attendance = (total_present / total_students * 100) if total_students > 0 else 0
+    
+    # Get recent sessions
+    fieldset = Fieldset.from_request(ClassSession)
+    reader = ReadModel(fieldset)
+    recent_sessions = reader.all(reader.select().filter(
+        and_(
+            ClassSession.teacher_id == user.id,
+            ClassSession.date.between(end_date - timedelta(days=7), date.today())
+        )
+    ).order_by(ClassSession.date.desc()).limit(5))
+    
+    return {
+        'total_sessions': total_sessions,
+        'total_students': total_students,
+        'total_present': total_present,
+        'total_absent': total_absent,
+        'average_attendance': round(avg_attendance, 2),
+        'recent_sessions': fieldset.serialize_all(recent_sessions)
+    }
+
+def _build_trend(buckets, start_date, end_date):
+    totals = {}
+    for bucket in buckets:
+        if bucket.count and start_date <= bucket.date <= end_date:
+            total, present = totals.get(bucket.date, (0, 0))
+            totals[bucket.date] = (
+                total + bucket.count,
+                present + (bucket.count if bucket.status == 'present' else 0)
+            )
+    
+    trend_data = []
+    for session_date in sorted(totals):
+        total, present = totals[session_date]
+        percentage = (present / total * 100) if total > 0 else 0
+        trend_data.append({
+            'date': session_date.isoformat(),
+            'total': total,
+            'present': present,
+            'percentage': round(percentage, 2)
+        })
+    
+    return {
+        'trend_data': trend_data
+    }
+
+def _build_subject_analysis(user, buckets, since):
+    totals = {}
+    for bucket in buckets:
+        if bucket.count and bucket.date >= since:
+            total, present = totals.get(bucket.subject_id, (0, 0))
+            totals[bucket.subject_id] = (
+                total + bucket.count,
+                present + (bucket.count if bucket.status == 'present' else 0)
+            )
+    
+    # Students count their sessions, teachers count attendance records
+    if user.role == 'student':
+        total_key, present_key = 'total_sessions', 'present_sessions'
+    else:
+        total_key, present_key = 'total_attendances', 'present_attendances'
+    
+    analysis = []
+    for subject_id, (total, present) in totals.items():
+        percentage = (present / total * 100) if total > 0 else 0
+        analysis.append({
+            'subject_id': subject_id,
+            'subject': subject_cache.name_for(subject_id),
+            total_key: total,
+            present_key: present,
+            'attendance_percentage': round(percentage, 2)
+        })
+    
+    analysis.sort(key=lambda item: item['subject'])
+    
+    return {
+        'subject_analysis': analysis
+    }
+
+DEPARTMENT_COUNTERS = ('students', 'sessions', 'total_records', 'present', 'absent', 'late')
+
+def _department_totals(start_date, end_date):
+    """{department: counters} over the current database (archived years
+    included when the range reaches them), up to today at the latest"""
+    totals = {}
+    end_date = min(end_date, date.today())
+    
+    def entry(department):
+        return totals.setdefault(department, dict.fromkeys(DEPARTMENT_COUNTERS, 0))
+    
+    students = db.session.query(User.department, func.count(User.id)).filter(
+        User.role == 'student',
+        User.is_active.isnot(False)
+    ).group_by(User.department)
+    for department, count in students:
+        entry(department)['students'] = count
+    
+    for attendance_model, session_model in _session_sources(start_date):
+        sessions = db.session.query(session_model.department, func.count(session_model.id)).filter(
+            session_model.date.between(start_date, end_date)
+        ).group_by(session_model.department)
+        for department, count in sessions:
+            entry(department)['sessions'] += count
+        
+        records = db.session.query(
+            session_model.department, attendance_model.status, func.count(attendance_model.id)
+        ).join(
+            attendance_model, attendance_model.class_session_id == session_model.id
+        ).filter(
+            session_model.date.between(start_date, end_date)
+        ).group_by(session_model.department, attendance_model.status)
+        for department, status, count in records:
+            counters = entry(department)
+            counters['total_records'] += count
+            if status in counters:
+                counters[status] += count
+    return totals
+
+@dashboard_bp.route('/departments', methods=['GET'])
+@jwt_required()
+def get_department_report():
+    """Attendance totals per department across the whole college.
+    
+    With sharding every database is queried in parallel and the totals are
+    merged.
+    """
+    try:
+        current_user_id = get_jwt_identity()
+        user = User.query.get(current_user_id)
+        
+        if not user or user.role != 'teacher':
+            return jsonify({'error': 'Only teachers can view department reports'}), 403
+        
+        start_date, end_date = _date_range()
+        merged = {}
+        for _, totals in shard_router.fan_out(lambda: _department_totals(start_date, end_date)):
+            for department, counters in totals.items():
+                combined = merged.setdefault(department, dict.fromkeys(DEPARTMENT_COUNTERS, 0))
+                for name, count in counters.items():
+                    combined[name] += count
+        
+        departments = []
+        for department in sorted(merged, key=lambda name: name or ''):
+            counters = merged[department]
+            total = counters['total_records']
+            departments.append({
+                'department': department,
+                **counters,
+                'attendance_percentage': round(counters['present'] / total * 100, 2) if total else 0
+            })
+        
+        return jsonify({
+            'start_date': start_date.isoformat(),
+            'end_date': end_date.isoformat(),
+            'departments': departments
+        }), 200
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@dashboard_bp.route('/rollups', methods=['GET'])
+@jwt_required()
+def get_attendance_rollups():
+    """Attendance totals sliced by any of department, class, subject and week.
+    
+    ?group_by= lists the dimensions to break down by (default department);
+    dept, class, subject, start_date and end_date filter. Dates select whole
+    weeks; the response gives the range actually covered. Only the rollup
+    cube is read (`flask rollups refresh` keeps it current); with sharding
+    every database's cube is read in parallel and merged.
+    """
+    try:
+        current_user_id = get_jwt_identity()
+        user = User.query.get(current_user_id)
+        
+        if not user or user.role != 'teacher':
+            return jsonify({'error': 'Only teachers can view attendance rollups'}), 403
+        
+        group_by = [name.strip() for name in request.args.get('group_by', 'department').split(',') if name.strip()]
+        unknown = [name for name in group_by if name not in DIMENSIONS]
+        if unknown or len(set(group_by)) != len(group_by):
+            return jsonify({'error': f'group_by takes distinct dimensions from: {", ".join(DIMENSIONS)}'}), 400
+        
+        department = request.args.get('dept')
+        class_name = request.args.get('class')
+        subject = request.args.get('subject')
+        start_date = request.args.get('start_date')
+        end_date = request.args.get('end_date')
+        start_date = datetime.strptime(start_date, '%Y-%m-%d').date() if start_date else None
+        end_date = datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else None
+        
+        def slice_cube():
+            refreshed_at = rollup_cube.refreshed_at()
+            # Subject ids are per database; slices are merged by name
+            subject_id = subject_cache.id_for(subject) if subject else None
+            if subject and subject_id is None:
+                return refreshed_at, []
+            rows = rollup_cube.slice(group_by, department, class_name, subject_id, start_date, end_date)
+            return refreshed_at, [
+                (
+                    tuple(subject_cache.name_for(value) if name == 'subject' else value
+                          for name, value in zip(group_by, dimensions)),
+                    counts
+                )
+                for dimensions, counts in rows
+            ]
+        
+        merged = {}
+        refreshed = []
+        for _, (refreshed_at, rows) in shard_router.fan_out(slice_cube):
+            refreshed.append(refreshed_at)
+            for dimensions, counts in rows:
+                combined = merged.setdefault(dimensions, [0] * len(COUNTERS))
+                for index, count in enumerate(counts):
+                    combined[index] += count or 0
+        
+        results = []
+        for dimensions in sorted(merged, key=lambda values: tuple('' if value is None else str(value) for value in values)):
+            counters = dict(zip(COUNTERS, merged[dimensions]))
+            total = counters['total_records']
+            results.append({
+                **{name: value.isoformat() if hasattr(value, 'isoformat') else value
+                   for name, value in zip(group_by, dimensions)},
+                **counters,
+                'attendance_percentage': round(counters['present'] / total * 100, 2) if total else 0
+            })
+        
+        return jsonify({
+            'group_by': group_by,
+            'start_date': week_start(start_date).isoformat() if start_date else None,
+            'end_date': week_end(end_date).isoformat() if end_date else None,
+            # The stalest database's refresh time (None until every one was refreshed)
+            'refreshed_at': None if None in refreshed else min(refreshed).isoformat(),
+            'rollups': results
+        }), 200
+    
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @dashboard_bp.route('/stats', methods=['GET'])
 @jwt_required()
 def get_dashboard_stats():
@@ -20,90 +378,13 @@ def get_dashboard_stats():
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
-        # Get date range (default to last 30 days)
-        end_date = date.today()
-        start_date = end_date - timedelta(days=30)
-        
-        if request.args.get('start_date'):
-            start_date = datetime.strptime(request.args.get('start_date'), '%Y-%m-%d').date()
-        if request.args.get('end_date'):
-            end_date = datetime.strptime(request.args.get('end_date'), '%Y-%m-%d').date()
-        
-        if user.role == 'student':
-            # Student dashboard stats
-            attendances = Attendance.query.join(ClassSession).filter(
-                and_(
-                    Attendance.user_id == current_user_id,
-                    ClassSession.date >= start_date,
-                    ClassSession.date <= end_date
-                )
-            ).all()
-            
-            total_sessions = len(attendances)
-            present_count = len([a for a in attendances if a.status == 'present'])
-            absent_count = len([a for a in attendances if a.status == 'absent'])
-            late_count = len([a for a in attendances if a.status == 'late'])
-            
-            attendance_percentage = (present_count / total_sessions * 100) if total_sessions > 0 else 0
-            
-            # Get recent attendance
-            recent_attendances = Attendance.query.join(ClassSession).filter(
-                and_(
-                    Attendance.user_id == current_user_id,
-                    ClassSession.date >= end_date - timedelta(days=7)
-                )
-            ).order_by(ClassSession.date.desc()).limit(5).all()
-            
-            return jsonify({
-                'total_sessions': total_sessions,
-                'present': present_count,
-                'absent': absent_count,
-                'late': late_count,
-                'attendance_percentage': round(attendance_percentage, 2),
-                'recent_attendances': [att.to_dict() for att in recent_attendances],
-                'warning': attendance_percentage < 75
-            }), 200
-        
-        elif user.role == 'teacher':
-            # Teacher dashboard stats
-            sessions = ClassSession.query.filter(
-                and_(
-                    ClassSession.teacher_id == current_user_id,
-                    ClassSession.date >= start_date,
-                    ClassSession.date <= end_date
-                )
-            ).all()
-            
-            total_sessions = len(sessions)
-            total_students = 0
-            total_present = 0
-            total_absent = 0
-            
-            for session in sessions:
-                attendances = Attendance.query.filter_by(class_session_id=session.id).all()
-                total_students += len(attendances)
-                total_present += len([a for a in attendances if a.status == 'present'])
-                total_absent += len([a for a in attendances if a.status == 'absent'])
-            
-            avg_attendance = (total_present / total_students * 100) if total_students > 0 else 0
-            
-            # Get recent sessions
-            recent_sessions = ClassSession.query.filter(
-                and_(
-                    ClassSession.teacher_id == current_user_id,
-                    ClassSession.date >= end_date - timedelta(days=7)
-                )
-            ).order_by(ClassSession.date.desc()).limit(5).all()
-            
-            return jsonify({
-                'total_sessions': total_sessions,
-                'total_students': total_students,
-                'total_present': total_present,
-                'total_absent': total_absent,
-                'average_attendance': round(avg_attendance, 2),
-                'recent_sessions': [session.to_dict() for session in recent_sessions]
-            }), 200
+        start_date, end_date = _date_range()
+        buckets = _attendance_buckets(user, start_date, end_date)
         
+        return jsonify(_build_stats(user, buckets, start_date, end_date)), 200
+    
+    except FieldsetError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -118,71 +399,11 @@ def get_attendance_trend():
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
-        # Get date range (default to last 30 days)
-        end_date = date.today()
-        start_date = end_date - timedelta(days=30)
-        
-        if request.args.get('start_date'):
-            start_date = datetime.strptime(request.args.get('start_date'), '%Y-%m-%d').date()
-        if request.args.get('end_date'):
-            end_date = datetime.strptime(request.args.get('end_date'), '%Y-%m-%d').date()
-        
-        if user.role == 'student':
-            # Student attendance trend
-            attendances = db.session.query(
-                ClassSession.date,
-                func.count(Attendance.id).label('total'),
-                func.sum(func.case([(Attendance.status == 'present', 1)], else_=0)).label('present')
-            ).join(Attendance).filter(
-                and_(
-                    Attendance.user_id == current_user_id,
-                    ClassSession.date >= start_date,
-                    ClassSession.date <= end_date
-                )
-            ).group_by(ClassSession.date).order_by(ClassSession.date).all()
-            
-            trend_data = []
-            for date, total, present in attendances:
-                percentage = (present / total * 100) if total > 0 else 0
-                trend_data.append({
-                    'date': date.isoformat(),
-                    'total': total,
-                    'present': present,
-                    'percentage': round(percentage, 2)
-                })
-            
-            return jsonify({
-                'trend_data': trend_data
-            }), 200
-        
-        elif user.role == 'teacher':
-            # Teacher attendance trend
-            sessions_data = db.session.query(
-                ClassSession.date,
-                func.count(Attendance.id).label('total'),
-                func.sum(func.case([(Attendance.status == 'present', 1)], else_=0)).label('present')
-            ).join(Attendance).filter(
-                and_(
-                    ClassSession.teacher_id == current_user_id,
-                    ClassSession.date >= start_date,
-                    ClassSession.date <= end_date
-                )
-            ).group_by(ClassSession.date).order_by(ClassSession.date).all()
-            
-            trend_data = []
-            for date, total, present in sessions_data:
-                percentage = (present / total * 100) if total > 0 else 0
-                trend_data.append({
-                    'date': date.isoformat(),
-                    'total': total,
-                    'present': present,
-                    'percentage': round(percentage, 2)
-                })
-            
-            return jsonify({
-                'trend_data': trend_data
-            }), 200
+        start_date, end_date = _date_range()
+        buckets = _attendance_buckets(user, start_date, end_date)
         
+        return jsonify(_build_trend(buckets, start_date, end_date)), 200
+    
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -197,59 +418,43 @@ def get_subject_analysis():
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
-        if user.role == 'student':
-            # Student subject analysis
-            subject_data = db.session.query(
-                ClassSession.subject,
-                func.count(Attendance.id).label('total'),
-                func.sum(func.case([(Attendance.status == 'present', 1)], else_=0)).label('present')
-            ).join(Attendance).filter(
-                and_(
-                    Attendance.user_id == current_user_id,
-                    ClassSession.date >= date.today() - timedelta(days=30)
-                )
-            ).group_by(ClassSession.subject).all()
-            
-            analysis = []
-            for subject, total, present in subject_data:
-                percentage = (present / total * 100) if total > 0 else 0
-                analysis.append({
-                    'subject': subject,
-                    'total_sessions': total,
-                    'present_sessions': present,
-                    'attendance_percentage': round(percentage, 2)
-                })
-            
-            return jsonify({
-                'subject_analysis': analysis
-            }), 200
-        
-        elif user.role == 'teacher':
-            # Teacher subject analysis
-            subject_data = db.session.query(
-                ClassSession.subject,
-                func.count(Attendance.id).label('total'),
-                func.sum(func.case([(Attendance.status == 'present', 1)], else_=0)).label('present')
-            ).join(Attendance).filter(
-                and_(
-                    ClassSession.teacher_id == current_user_id,
-                    ClassSession.date >= date.today() - timedelta(days=30)
-                )
-            ).group_by(ClassSession.subject).all()
-            
-            analysis = []
-            for subject, total, present in subject_data:
-                percentage = (present / total * 100) if total > 0 else 0
-                analysis.append({
-                    'subject': subject,
-                    'total_attendances': total,
-                    'present_attendances': present,
-                    'attendance_percentage': round(percentage, 2)
-                })
-            
-            return jsonify({
-                'subject_analysis': analysis
-            }), 200
+        since = _subject_window_start()
+        buckets = _attendance_buckets(user, since)
+        
+        return jsonify(_build_subject_analysis(user, buckets, since)), 200
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@dashboard_bp.route('/overview', methods=['GET'])
+@jwt_required()
+def get_dashboard_overview():
+    """Stats, attendance trend and subject analysis from one attendance scan.
+    
+    Each section is exactly the response of /stats, /attendance-trend and
+    /subject-analysis for the same query string.
+    """
+    try:
+        current_user_id = get_jwt_identity()
+        user = User.query.get(current_user_id)
+        
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        start_date, end_date = _date_range()
+        since = _subject_window_start()
+        
+        # Subject analysis runs up to today, so the shared scan does too;
+        # each section keeps only its own window
+        buckets = _attendance_buckets(user, min(start_date, since))
         
+        return jsonify({
+            'stats': _build_stats(user, buckets, start_date, end_date),
+            'attendance_trend': _build_trend(buckets, start_date, end_date),
+            'subject_analysis': _build_subject_analysis(user, buckets, since)
+        }), 200
+    
+    except FieldsetError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500 
\ No newline at end of file
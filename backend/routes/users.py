@@ -2,10 +2,41 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from models.user import User
-from sqlalchemy import and_
+from utils.fieldsets import Fieldset, FieldsetError
+from utils.read_models import ReadModel
+from utils.revocation import revoke_tokens
+from utils.user_search import filter_by_search, match_expression
+from utils.sharding import shard_router
+from sqlalchemy import and_, func
 
 users_bp = Blueprint('users', __name__)
 
+def _filter_visible_users(query, current_user):
+    """Apply the role/class/dept query parameters and the caller's visibility"""
+    # Get query parameters
+    role = request.args.get('role')
+    class_name = request.args.get('class')
+    department = request.args.get('dept')
+    
+    # Apply filters
+    if role:
+        query = query.filter(User.role == role)
+    if class_name:
+        query = query.filter(User.class_name == class_name)
+    if department:
+        query = query.filter(User.department == department)
+    
+    # Teachers can only see students in their classes
+    if current_user.role == 'teacher':
+        query = query.filter(
+            and_(
+                User.role == 'student',
+                User.class_name == current_user.class_name,
+                User.department == current_user.department
+            )
+        )
+    return query
+
 @users_bp.route('/', methods=['GET'])
 @jwt_required()
 def get_users():
@@ -17,37 +48,58 @@ def get_users():
         if not current_user:
             return jsonify({'error': 'User not found'}), 404
         
-        # Get query parameters
-        role = request.args.get('role')
-        class_name = request.args.get('class')
-        department = request.args.get('dept')
-        
-        query = User.query
-        
-        # Apply filters
-        if role:
-            query = query.filter(User.role == role)
-        if class_name:
-            query = query.filter(User.class_name == class_name)
-        if department:
-            query = query.filter(User.department == department)
-        
-        # Teachers can only see students in their classes
-        if current_user.role == 'teacher':
-            query = query.filter(
-                and_(
-                    User.role == 'student',
-                    User.class_name == current_user.class_name,
-                    User.department == current_user.department
-                )
-            )
+        fieldset = Fieldset.from_request(User)
+        reader = ReadModel(fieldset)
+        users = reader.all(_filter_visible_users(reader.select(), current_user))
+        
+        return jsonify({
+            'users': fieldset.serialize_all(users)
+        }), 200
+        
+    except FieldsetError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@users_bp.route('/search', methods=['GET'])
+@jwt_required()
+def search_users():
+    """Search users by name, PRN or email prefix, best matches first.
+    
+    ?q= words all have to match the start of a word in one of the fields
+    ("ana pat", "S00", "ana@"). Takes the get_users filters, ?fields= and
+    page/per_page.
+    """
+    try:
+        current_user_id = get_jwt_identity()
+        current_user = User.query.get(current_user_id)
+        
+        if not current_user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        if not match_expression(request.args.get('q')):
+            return jsonify({'error': 'q is required'}), 400
+        
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = min(max(request.args.get('per_page', 20, type=int), 1), 100)
+        
+        fieldset = Fieldset.from_request(User)
+        reader = ReadModel(fieldset)
+        stmt, rank = filter_by_search(reader.select(), request.args['q'])
+        stmt = _filter_visible_users(stmt, current_user)
+        total = db.session.execute(stmt.with_only_columns(func.count(User.id))).scalar()
         
-        users = query.all()
+        users = reader.all(stmt.order_by(rank, User.id).limit(per_page).offset((page - 1) * per_page))
         
         return jsonify({
-            'users': [user.to_dict() for user in users]
+            'users': fieldset.serialize_all(users),
+            'total': total,
+            'page': page,
+            'per_page': per_page
         }), 200
         
+    except FieldsetError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -106,6 +158,8 @@ def update_user(user_id):
         if data.get('name'):
             user.name = data['name']
         if data.get('email'):
+            if data['email'] != user.email and shard_router.exists(User.email == data['email']):
+                return jsonify({'error': 'Email already registered'}), 409
             user.email = data['email']
         if data.get('class_name'):
             user.class_name = data['class_name']
@@ -139,6 +193,7 @@ def deactivate_user(user_id):
             return jsonify({'error': 'User not found'}), 404
         
         user.is_active = False
+        revoke_tokens(user, 'deactivated')
         db.session.commit()
         
         return jsonify({
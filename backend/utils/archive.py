@@ -0,0 +1,114 @@
+from datetime import date, timedelta
+from sqlalchemy import event, select, insert, delete, func
+from app import db
+from models.attendance import Attendance
+from models.class_session import ClassSession
+from models.archive import ARCHIVE_SCHEMA, ArchivedAttendance, ArchivedClassSession, ArchivedYear
+
+
+def configure_archive(app):
+    """Point the logical archive schema at its storage.
+    
+    Must run before db.init_app(). Without ARCHIVE_DATABASE_PATH the archive
+    tables sit next to the hot tables in the main database; with it (SQLite
+    only) that file is attached to every connection as the "archive" schema.
+    Either way the archive is reachable from the same connection, so moving
+    a year is a single transaction and hot + archive reads can be combined.
+    """
+    archive_path = app.config.get('ARCHIVE_DATABASE_PATH')
+    if archive_path and app.config.get('SHARD_DEPARTMENTS'):
+        # Each shard keeps its own archive tables instead
+        raise RuntimeError('ARCHIVE_DATABASE_PATH cannot be combined with SHARD_DEPARTMENTS')
+    engine_options = app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {})
+    execution_options = engine_options.setdefault('execution_options', {})
+    execution_options['schema_translate_map'] = {ARCHIVE_SCHEMA: ARCHIVE_SCHEMA if archive_path else None}
+
+
+def attach_archive(app):
+    """Attach ARCHIVE_DATABASE_PATH on each new connection (after db.init_app())"""
+    archive_path = app.config.get('ARCHIVE_DATABASE_PATH')
+    if not archive_path:
+        return
+    
+    with app.app_context():
+        engine = db.engine
+    
+    @event.listens_for(engine, 'connect')
+    def _attach(dbapi_connection, connection_record):
+        dbapi_connection.execute(f"ATTACH DATABASE ? AS {ARCHIVE_SCHEMA}", (archive_path,))
+
+
+def academic_year_bounds(start_year, start_month):
+    """Return (label, first_day, last_day) for the academic year starting in start_year"""
+    first_day = date(start_year, start_month, 1)
+    last_day = date(start_year + 1, start_month, 1) - timedelta(days=1)
+    return f'{start_year}-{(start_year + 1) % 100:02d}', first_day, last_day
+
+
+def archive_academic_year(start_year, start_month, dry_run=False):
+    """Move one closed academic year's sessions and attendance to the archive.
+    
+    Returns (label, sessions, attendances) counts. Everything happens in the
+    current transaction; the caller commits.
+    """
+    label, first_day, last_day = academic_year_bounds(start_year, start_month)
+    if last_day >= date.today():
+        raise ValueError(f'Academic year {label} has not ended yet')
+    if ArchivedYear.query.filter_by(academic_year=label).first():
+        raise ValueError(f'Academic year {label} is already archived')
+    
+    hot_sessions = ClassSession.__table__
+    hot_attendances = Attendance.__table__
+    session_ids = select(hot_sessions.c.id).where(hot_sessions.c.date.between(first_day, last_day))
+    
+    session_count = db.session.execute(
+        select(func.count()).select_from(session_ids.subquery())
+    ).scalar()
+    attendance_count = db.session.execute(
+        select(func.count()).where(hot_attendances.c.class_session_id.in_(session_ids))
+    ).scalar()
+    
+    if dry_run:
+        return label, session_count, attendance_count
+    
+    # Copy using the archive tables' columns, then remove from the hot tables
+    session_columns = [column.name for column in ArchivedClassSession.__table__.columns]
+    db.session.execute(
+        insert(ArchivedClassSession.__table__).from_select(
+            session_columns,
+            select(*[hot_sessions.c[name] for name in session_columns]).where(hot_sessions.c.id.in_(session_ids))
+        )
+    )
+    attendance_columns = [column.name for column in ArchivedAttendance.__table__.columns]
+    db.session.execute(
+        insert(ArchivedAttendance.__table__).from_select(
+            attendance_columns,
+            select(*[hot_attendances.c[name] for name in attendance_columns]).where(
+                hot_attendances.c.class_session_id.in_(session_ids)
+            )
+        )
+    )
+    db.session.execute(delete(hot_attendances).where(hot_attendances.c.class_session_id.in_(session_ids)))
+    db.session.execute(delete(hot_sessions).where(hot_sessions.c.id.in_(session_ids)))
+    
+    db.session.add(ArchivedYear(
+        academic_year=label,
+        start_date=first_day,
+        end_date=last_day,
+        sessions_archived=session_count,
+        attendances_archived=attendance_count
+    ))
+    return label, session_count, attendance_count
+
+
+def archive_boundary():
+    """Last date covered by the archive (None if nothing is archived)"""
+    return db.session.execute(select(func.max(ArchivedYear.end_date))).scalar()
+
+
+def includes_archive(start_date):
+    """Whether a query starting at start_date (None = all history) can reach archived rows"""
+    boundary = archive_boundary()
+    if boundary is None:
+        return False
+    return start_date is None or start_date <= boundary
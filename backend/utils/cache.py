@@ -0,0 +1,41 @@
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+_PENDING_KEY = 'pending_cache_invalidations'
+
+
+def invalidate_on_commit(model, callback):
+    """Call `callback()` when a transaction that changed a `model` row ends.
+    
+    Invalidating at commit time (rather than at flush) means a concurrent
+    request can't rebuild the cache from rows that are not yet visible to
+    it. The callback also runs on rollback, since the same session may have
+    cached rows that no longer exist. Bulk Core statements bypass these
+    events, so code that uses them must register it with
+    invalidate_when_done().
+    """
+    def mark_pending(mapper, connection, target):
+        session = object_session(target)
+        if session is not None:
+            invalidate_when_done(session, callback)
+    
+    for event_name in ('after_insert', 'after_update', 'after_delete'):
+        event.listen(model, event_name, mark_pending)
+
+
+def invalidate_when_done(session, callback):
+    """Call `callback()` when `session`'s transaction commits or rolls back,
+    for writes made with Core statements"""
+    session.info.setdefault(_PENDING_KEY, set()).add(callback)
+
+
+@event.listens_for(Session, 'after_commit')
+def _run_pending_invalidations(session):
+    for callback in session.info.pop(_PENDING_KEY, ()):
+        callback()
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _run_invalidations_on_rollback(session, previous_transaction):
+    if not session.in_transaction():
+        _run_pending_invalidations(session)
@@ -0,0 +1,69 @@
+from sqlalchemy import select, update
+from app import db
+from models.attendance import Attendance
+from models.class_session import ClassSession
+from models.change_counter import ChangeCounter
+from utils.read_models import ReadModel
+
+PAGE_SIZE = 500
+MAX_PAGE_SIZE = 2000
+
+
+def current_version():
+    """Last change version handed out in the current database (0 if none)"""
+    return db.session.execute(select(ChangeCounter.version).where(ChangeCounter.id == 1)).scalar() or 0
+
+
+def release_day(day):
+    """Give the attendance of `day`'s sessions new change versions.
+
+    The feed holds back attendance of sessions after today (pre-generated
+    defaults), so when their day comes those rows need versions above the
+    cursors clients already hold. The no-op update fires the version
+    trigger. Returns the rows re-stamped; the caller commits.
+    """
+    sessions = select(ClassSession.id).where(ClassSession.date == day)
+    return db.session.execute(
+        update(Attendance).where(Attendance.class_session_id.in_(sessions)).values(status=Attendance.status)
+    ).rowcount
+
+
+class ChangeFeed:
+    """Rows of several models written after a cursor, in version order.
+
+    `sources` maps a response key to (fieldset, criteria): the rows a user
+    may see and how to serialize them. Each model is read with one select
+    on its version index, bounded by the counter as read up front, so rows
+    committed meanwhile wait for the next call instead of being skipped.
+    The returned cursor is the last version served, or the bound once the
+    client has caught up.
+    """
+
+    def __init__(self, sources):
+        self.sources = sources
+
+    def since(self, cursor, limit=PAGE_SIZE):
+        upper = current_version()
+        rows = []
+        for key, (fieldset, criteria) in self.sources.items():
+            model = fieldset.model
+            reader = ReadModel(fieldset)
+            query = (
+                reader.select()
+                .where(model.version > cursor, model.version <= upper, *criteria)
+                .order_by(model.version)
+                .limit(limit + 1)
+            )
+            rows.extend((record.version, key, fieldset, record) for record in reader.all(query))
+        rows.sort(key=lambda row: row[0])
+
+        has_more = len(rows) > limit
+        page = rows[:limit]
+        changes = {key: [] for key in self.sources}
+        for _, key, fieldset, record in page:
+            changes[key].append(fieldset.serialize(record))
+        return {
+            **changes,
+            'cursor': page[-1][0] if has_more else max(cursor, upper),
+            'has_more': has_more
+        }
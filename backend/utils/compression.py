@@ -0,0 +1,82 @@
+import gzip
+from flask import request
+from utils.metrics import metrics
+
+try:
+    import brotli
+except ImportError:  # optional: pip install brotli
+    brotli = None
+
+
+def available_encodings():
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def choose_encoding(accept_encodings, preferred):
+    """Pick the first of `preferred` the client accepts (q > 0), or None"""
+    for encoding in preferred:
+        if encoding in available_encodings() and accept_encodings.quality(encoding) > 0:
+            return encoding
+    return None
+
+
+def compress(body, encoding, level):
+    """Compress a whole body in one go"""
+    if encoding == 'br':
+        return brotli.compress(body, quality=level)
+    return gzip.compress(body, compresslevel=level)
+
+
+def init_compression(app):
+    """Compress large responses with the best encoding the client accepts.
+    
+    Only the mimetypes in COMPRESS_MIMETYPES (JSON by default) are
+    compressed; images, files and other already-compressed bodies go out
+    as-is. So do bodies under COMPRESS_MIN_SIZE (compressing small payloads
+    costs more CPU than it saves on the wire). Already-streaming responses
+    (e.g. SSE) are never touched.
+    """
+    if not app.config.get('COMPRESS_ENABLED', True):
+        return
+    
+    min_size = app.config.get('COMPRESS_MIN_SIZE', 1024)
+    mimetypes = set(app.config.get('COMPRESS_MIMETYPES', ('application/json',)))
+    preferred = app.config.get('COMPRESS_ALGORITHMS', ('br', 'gzip'))
+    levels = {
+        'gzip': app.config.get('COMPRESS_GZIP_LEVEL', 6),
+        'br': app.config.get('COMPRESS_BR_LEVEL', 4)
+    }
+    
+    @app.after_request
+    def compress_response(response):
+        if (
+            response.direct_passthrough
+            or response.is_streamed
+            or response.status_code < 200
+            or response.status_code in (204, 304)
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in mimetypes
+        ):
+            return response
+        
+        response.vary.add('Accept-Encoding')
+        
+        content_length = response.calculate_content_length()
+        if content_length is None or content_length < min_size:
+            return response
+        
+        encoding = choose_encoding(request.accept_encodings, preferred)
+        if encoding is None:
+            return response
+        
+        level = levels[encoding]
+        body = response.get_data()
+        metrics.incr('compression.bytes_in', len(body))
+        
+        with metrics.timer(f'compression.{encoding}'):
+            compressed = compress(body, encoding, level)
+        response.set_data(compressed)
+        metrics.incr('compression.bytes_out', len(compressed))
+        
+        response.headers['Content-Encoding'] = encoding
+        return response
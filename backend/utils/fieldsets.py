@@ -0,0 +1,129 @@
+from flask import request
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only, selectinload
+
+
+class FieldsetError(ValueError):
+    """Unknown field or relationship in ?fields= / ?expand="""
+
+
+def _split(value):
+    if value is None:
+        return None
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def fieldset_args():
+    """Raw (fields, expand) lists from the query string (None when absent)"""
+    return _split(request.args.get('fields')), _split(request.args.get('expand'))
+
+
+def _json_value(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+class Fieldset:
+    """Which fields and relationships of `model` a client asked for.
+    
+    Models opt in by declaring:
+        HIDDEN_FIELDS     columns never exposed (e.g. password_hash)
+        COMPUTED_FIELDS   {name: (attribute, columns it needs)}
+        EXPANDABLE_FIELDS relationship names that ?expand= may embed
+    
+    With neither ?fields= nor ?expand= the fieldset is the default one: rows
+    serialize through the model's own to_dict(), exactly as before, and the
+    relationships to_dict() embeds are eager loaded. Otherwise only the
+    listed fields (all public fields if ?fields= is absent) are selected,
+    and a relationship is loaded and embedded only if it is expanded. Nested
+    relationships use dotted paths: ?expand=class_session,class_session.teacher
+    """
+    
+    def __init__(self, model, fields=None, expand=None, extra_columns=(), _default=None):
+        self.model = model
+        self.is_default = (fields is None and expand is None) if _default is None else _default
+        mapper = inspect(model)
+        
+        hidden = getattr(model, 'HIDDEN_FIELDS', ())
+        computed = getattr(model, 'COMPUTED_FIELDS', {})
+        expandable = getattr(model, 'EXPANDABLE_FIELDS', ())
+        
+        public = [attr.key for attr in mapper.column_attrs if attr.key not in hidden] + list(computed)
+        self.fields = public if fields is None else fields
+        unknown = [name for name in self.fields if name not in public]
+        if unknown:
+            raise FieldsetError(f'Unknown field(s) for {model.__tablename__}: {", ".join(unknown)}')
+        
+        if self.is_default and expand is None:
+            expand = self._default_expand(model)
+        
+        # Top-level relationship -> nested expand paths
+        nested = {}
+        for path in expand or ():
+            name, _, rest = path.partition('.')
+            if name not in expandable:
+                raise FieldsetError(f'Cannot expand {path} on {model.__tablename__}')
+            nested.setdefault(name, [])
+            if rest:
+                nested[name].append(rest)
+        
+        # Expanded objects carry all their fields; their own relationships are opt-in too
+        self.children = {
+            name: Fieldset(mapper.relationships[name].mapper.class_, None, paths, _default=self.is_default)
+            for name, paths in nested.items()
+        }
+        
+        # Columns to select: requested fields, what computed fields read, the
+        # foreign keys expanded relationships load through, and any the caller
+        # needs for itself (e.g. to sort)
+        self._computed = computed
+        needed = set(extra_columns)
+        for name in self.fields:
+            needed.update(computed[name][1] if name in computed else (name,))
+        for name in self.children:
+            needed.update(column.key for column in mapper.relationships[name].local_columns)
+        self.columns = [attr.key for attr in mapper.column_attrs if attr.key in needed]
+    
+    @classmethod
+    def from_request(cls, model, **kwargs):
+        fields, expand = fieldset_args()
+        return cls(model, fields, expand, **kwargs)
+    
+    @staticmethod
+    def _default_expand(model):
+        """Relationships to_dict() embeds, recursively, as dotted paths"""
+        paths = []
+        mapper = inspect(model)
+        for name in getattr(model, 'EXPANDABLE_FIELDS', ()):
+            paths.append(name)
+            target = mapper.relationships[name].mapper.class_
+            paths.extend(f'{name}.{path}' for path in Fieldset._default_expand(target))
+        return paths
+    
+    def query_options(self):
+        """Loader options selecting only what will be serialized"""
+        options = []
+        if not self.is_default:
+            options.append(load_only(*[getattr(self.model, column) for column in self.columns]))
+        for name, child in self.children.items():
+            loader = selectinload(getattr(self.model, name))
+            child_options = child.query_options()
+            options.append(loader.options(*child_options) if child_options else loader)
+        return options
+    
+    def serialize(self, obj):
+        # Read-model records (utils/read_models.py) have no to_dict() and
+        # always take the field by field path, which gives the same output
+        if self.is_default and hasattr(obj, 'to_dict'):
+            return obj.to_dict()
+        
+        data = {}
+        for name in self.fields:
+            attribute = self._computed[name][0] if name in self._computed else name
+            data[name] = _json_value(getattr(obj, attribute))
+        for name, child in self.children.items():
+            related = getattr(obj, name)
+            data[name] = child.serialize(related) if related is not None else None
+        return data
+    
+    def serialize_all(self, objs):
+        return [self.serialize(obj) for obj in objs]
@@ -0,0 +1,142 @@
+import atexit
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from sqlalchemy import update, bindparam
+from models.attendance import Attendance
+from utils.metrics import metrics
+from utils.sharding import shard_router
+
+_STOP = object()
+
+
+class GroupCommitWriter:
+    """Coalesces attendance status updates from many requests into one commit.
+    
+    Requests submit their row changes and wait on the returned Future. A
+    single writer thread collects whatever arrives within
+    GROUP_COMMIT_WINDOW_MS (up to GROUP_COMMIT_MAX_BATCH submissions), writes
+    it all in one transaction and resolves every Future once that commit
+    returned, so callers only see success for durable changes. SQLite then
+    pays one lock acquisition and one fsync per group instead of per request.
+    
+    If a group fails, its submissions are retried one transaction each, so a
+    bad submission only fails its own caller. With sharding, submissions are
+    written to the database of the request that made them, one transaction
+    per database. Each worker process has its own
+    writer thread, started lazily so it survives gunicorn's fork.
+    """
+    
+    def __init__(self):
+        self.enabled = False
+        self._app = None
+        self._queue = queue.Queue()
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+    
+    def init_app(self, app):
+        self.enabled = app.config.get('GROUP_COMMIT_ENABLED', False)
+        self.window = app.config.get('GROUP_COMMIT_WINDOW_MS', 5) / 1000
+        self.max_batch = app.config.get('GROUP_COMMIT_MAX_BATCH', 256)
+        self.timeout = app.config.get('GROUP_COMMIT_TIMEOUT_SECONDS', 10)
+        self._app = app
+    
+    def submit(self, rows):
+        """Queue attendance updates ({'id', 'status', 'notes'} dicts); returns a Future"""
+        future = Future()
+        self._ensure_started()
+        self._queue.put((shard_router.current(), rows, future))
+        return future
+    
+    def _ensure_started(self):
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='group-commit-writer', daemon=True)
+                self._thread.start()
+    
+    def close(self):
+        """Write what is queued and stop the writer thread"""
+        if self._thread is not None and self._pid == os.getpid():
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+    
+    def _collect(self):
+        """Block for the first submission, then gather more until the window closes"""
+        first = self._queue.get()
+        if first is _STOP:
+            return [], True
+        batch = [first]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+    
+    def _run(self):
+        with self._app.app_context():
+            stopping = False
+            while not stopping:
+                batch, stopping = self._collect()
+                if batch:
+                    self._write(batch)
+    
+    def _write(self, batch):
+        metrics.incr('group_commit.batches')
+        metrics.incr('group_commit.submissions', len(batch))
+        groups = {}
+        for key, rows, future in batch:
+            groups.setdefault(key, []).append((rows, future))
+        for key, submissions in groups.items():
+            self._write_group(key, submissions)
+    
+    def _write_group(self, key, submissions):
+        try:
+            with metrics.timer('group_commit.commit'):
+                self._execute(key, [row for rows, _ in submissions for row in rows])
+        except Exception:
+            # Find the submission that broke the group; the rest still commit
+            for rows, future in submissions:
+                try:
+                    self._execute(key, rows)
+                except Exception as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(len(rows))
+            return
+        for rows, future in submissions:
+            future.set_result(len(rows))
+    
+    @staticmethod
+    def _execute(key, rows):
+        if not rows:
+            return
+        stmt = update(Attendance.__table__).where(Attendance.__table__.c.id == bindparam('attendance_id')).values(
+            status=bindparam('status'),
+            notes=bindparam('notes')
+        )
+        with shard_router.engine(key).begin() as connection:
+            connection.execute(stmt, [
+                {'attendance_id': row['id'], 'status': row['status'], 'notes': row['notes']}
+                for row in rows
+            ])
+
+
+group_writer = GroupCommitWriter()
+
+atexit.register(group_writer.close)
@@ -0,0 +1,107 @@
+import base64
+from sqlalchemy import select, union_all
+from app import db
+
+# Cell codes; a day with several sessions gets one code for the whole day
+NO_SESSION = 0
+STATUS_CODES = {'present': 1, 'late': 2, 'absent': 3}
+MIXED = 4
+LEGEND = ['none', 'present', 'late', 'absent', 'mixed']
+
+ENCODINGS = ('base64', 'rle')
+
+
+def _day_code(codes):
+    """Code for one student and day: the status if all sessions agree, else mixed"""
+    first = codes[0]
+    for code in codes[1:]:
+        if code != first:
+            return MIXED
+    return first
+
+
+def _encode(cells, encoding):
+    if encoding == 'base64':
+        # One byte per cell, row major
+        return base64.b64encode(bytes(cells)).decode('ascii')
+    
+    # Flat [code, run, code, run, ...] over the row-major grid
+    runs = []
+    previous, length = None, 0
+    for code in cells:
+        if code == previous:
+            length += 1
+            continue
+        if length:
+            runs.extend((previous, length))
+        previous, length = code, 1
+    if length:
+        runs.extend((previous, length))
+    return runs
+
+
+class AttendanceHeatmap:
+    """One class's attendance as a students × dates matrix of status codes.
+    
+    Rows are read with a single select ordered by roll number and date,
+    over the hot tables and, when `archived` is given, the archived ones
+    (UNION ALL), then folded into one code per student and day. Students
+    without any record in the range are left out.
+    """
+    
+    def __init__(self, hot, archived=None):
+        # (attendance model, session model) pairs to read from
+        self.sources = [hot] + ([archived] if archived else [])
+    
+    def _select(self, attendance_model, session_model, criteria):
+        from models.user import User
+        return (
+            select(
+                User.id.label('student_id'), User.prn.label('prn'), User.name.label('name'),
+                session_model.date.label('date'), attendance_model.status.label('status')
+            )
+            .join_from(attendance_model, session_model, attendance_model.class_session_id == session_model.id)
+            .join(User, attendance_model.user_id == User.id)
+            .where(*criteria(session_model))
+        )
+    
+    def build(self, criteria, encoding='base64'):
+        """Matrix for the sessions matching criteria(session_model) (a list of clauses)"""
+        selects = [self._select(attendance, session, criteria) for attendance, session in self.sources]
+        stmt = selects[0] if len(selects) == 1 else union_all(*selects)
+        # By label, so the same ordering works for one select and for the union
+        rows = db.session.execute(stmt.order_by('prn', 'student_id', 'date')).all()
+        
+        dates = sorted({row[3] for row in rows})
+        column = {day: index for index, day in enumerate(dates)}
+        students = {'id': [], 'prn': [], 'name': []}
+        cells = []
+        
+        row_cells = day_codes = None
+        current_student = current_day = None
+        for student_id, prn, name, day, status in rows:
+            if student_id != current_student:
+                if row_cells is not None:
+                    row_cells[column[current_day]] = _day_code(day_codes)
+                    cells.extend(row_cells)
+                students['id'].append(student_id)
+                students['prn'].append(prn)
+                students['name'].append(name)
+                row_cells = [NO_SESSION] * len(dates)
+                current_student, current_day, day_codes = student_id, day, []
+            elif day != current_day:
+                row_cells[column[current_day]] = _day_code(day_codes)
+                current_day, day_codes = day, []
+            day_codes.append(STATUS_CODES.get(status, NO_SESSION))
+        if row_cells is not None:
+            row_cells[column[current_day]] = _day_code(day_codes)
+            cells.extend(row_cells)
+        
+        return {
+            'students': students,
+            'dates': [day.isoformat() for day in dates],
+            'shape': [len(students['id']), len(dates)],
+            'legend': LEGEND,
+            'encoding': encoding,
+            'grid': _encode(cells, encoding)
+        }
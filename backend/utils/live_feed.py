@@ -0,0 +1,135 @@
+import os
+import threading
+import time
+from sqlalchemy import select, func
+from app import db
+from models.attendance import Attendance
+from utils.changes import current_version
+from utils.metrics import metrics
+from utils.pubsub import attendance_feed
+from utils.sharding import shard_router
+
+
+def feed_topic(session_id, key=None):
+    """Live feed topic of a session; session ids repeat across shards"""
+    if not shard_router.enabled:
+        return session_id
+    return (shard_router.current() if key is None else key, session_id)
+
+
+def session_counts(session_id):
+    """Attendance counts per status (and in total) for one session"""
+    counts = {'total': 0, 'present': 0, 'absent': 0, 'late': 0}
+    rows = db.session.execute(
+        select(Attendance.status, func.count(Attendance.id))
+        .where(Attendance.class_session_id == session_id)
+        .group_by(Attendance.status)
+    ).all()
+    for status, count in rows:
+        counts['total'] += count
+        counts[status] = counts.get(status, 0) + count
+    return counts
+
+
+class AttendanceWatcher:
+    """Feeds committed attendance changes to this process's SSE subscribers.
+    
+    Updates can be committed by any worker process, so rather than having
+    the writing request publish, every process polls the change counter
+    (see models/change_counter.py) every SSE_POLL_SECONDS while it has
+    subscribers. When the counter moved, the attendance rows stamped since
+    the last poll are read for the subscribed sessions only and published
+    as one delta per session. With sharding each database is polled with
+    its own watermark. The thread starts with the first subscriber, and
+    again after gunicorn's fork.
+    """
+    
+    def __init__(self):
+        self._app = None
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._watermarks = {}  # shard key -> change version already published
+    
+    def init_app(self, app):
+        self.interval = app.config.get('SSE_POLL_SECONDS', 1)
+        self._app = app
+    
+    def watch(self):
+        """Make sure the current database is polled from now on (call after subscribing)"""
+        self._ensure_started()
+        key = shard_router.current()
+        if key not in self._watermarks:
+            version = current_version()
+            with self._lock:
+                self._watermarks.setdefault(key, version)
+    
+    def _ensure_started(self):
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._watermarks = {}
+                self._thread = threading.Thread(target=self._run, name='attendance-watcher', daemon=True)
+                self._thread.start()
+    
+    def _run(self):
+        with self._app.app_context():
+            while True:
+                time.sleep(self.interval)
+                try:
+                    self.poll()
+                except Exception:
+                    metrics.incr('sse.poll_errors')
+    
+    def poll(self):
+        """Publish what changed since the last poll; returns deltas published"""
+        sessions = {}  # shard key -> subscribed session ids
+        with self._lock:
+            for topic in attendance_feed.topics():
+                key, session_id = topic if shard_router.enabled else (None, topic)
+                sessions.setdefault(key, set()).add(session_id)
+            # Databases nobody listens to any more start over on the next watch()
+            for key in set(self._watermarks) - set(sessions):
+                del self._watermarks[key]
+        
+        published = 0
+        for key, session_ids in sessions.items():
+            with shard_router.use(key):
+                published += self._poll_database(key, session_ids)
+        return published
+    
+    def _poll_database(self, key, session_ids):
+        high = current_version()
+        with self._lock:
+            low = self._watermarks.get(key)
+            self._watermarks[key] = high if low is None else max(low, high)
+        if low is None or high <= low:
+            return 0
+        
+        rows = db.session.execute(
+            select(Attendance.class_session_id, Attendance.user_id, Attendance.status, Attendance.notes)
+            .where(
+                Attendance.version > low,
+                Attendance.version <= high,
+                Attendance.class_session_id.in_(session_ids)
+            )
+            .order_by(Attendance.version)
+        ).all()
+        changes = {}
+        for session_id, user_id, status, notes in rows:
+            changes.setdefault(session_id, []).append({'user_id': user_id, 'status': status, 'notes': notes})
+        
+        for session_id, session_changes in changes.items():
+            attendance_feed.publish(feed_topic(session_id, key), {
+                'class_session_id': session_id,
+                'changes': session_changes,
+                'counts': session_counts(session_id)
+            })
+            metrics.incr('sse.updates_published')
+        return len(changes)
+
+
+attendance_watcher = AttendanceWatcher()
@@ -0,0 +1,214 @@
+import cProfile
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime
+from flask import g, request, has_request_context
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from utils.metrics import metrics
+
+# Longest SQL statement text kept in a profile
+MAX_STATEMENT_LENGTH = 500
+
+# Stripped from file names in reports
+PATH_PREFIXES = [os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep] + [
+    path + os.sep for path in sys.path if path.endswith('site-packages')
+]
+
+
+def _short_name(function):
+    name = pstats.func_std_string(function)
+    for prefix in PATH_PREFIXES:
+        if name.startswith(prefix):
+            return name[len(prefix):]
+    return name
+
+
+class RequestProfiler:
+    """Runs flagged requests under cProfile and stores the result on disk.
+    
+    With PROFILING_ENABLED, a request carrying ?profile=1 or an `X-Profile: 1`
+    header from a user whose role is in PROFILING_ROLES is profiled, and the
+    time of every SQL statement it runs is recorded. Each profile is written
+    to PROFILING_DIR as <id>.prof (pstats) and <id>.json (request and SQL
+    timings); the id is returned in the X-Profile-Id response header and only
+    the newest PROFILING_MAX_PROFILES are kept. `flask profiles` lists them
+    and shows the hottest functions per endpoint.
+    
+    When the mode is off no hooks are installed at all. One request per
+    process is profiled at a time; others run normally.
+    """
+    
+    def __init__(self):
+        self.enabled = False
+        self.directory = None
+        self._lock = threading.Lock()
+    
+    def init_app(self, app):
+        self.enabled = app.config.get('PROFILING_ENABLED', False)
+        self.directory = app.config.get('PROFILING_DIR') or os.path.join(app.instance_path, 'profiles')
+        self.roles = tuple(app.config.get('PROFILING_ROLES', ('teacher',)))
+        self.max_profiles = app.config.get('PROFILING_MAX_PROFILES', 500)
+        if not self.enabled:
+            return
+        
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.teardown_request(self._release)
+        event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+    
+    # Request hooks
+    
+    def _requested(self):
+        flag = request.headers.get('X-Profile') or request.args.get('profile')
+        return flag in ('1', 'true')
+    
+    def _authorized(self):
+        from models.user import User
+        try:
+            verify_jwt_in_request(optional=True)
+            user_id = get_jwt_identity()
+        except Exception:
+            return None
+        if user_id is None:
+            return None
+        user = User.query.get(user_id)
+        return user_id if user and user.role in self.roles else None
+    
+    def _start(self):
+        if not self._requested():
+            return
+        user_id = self._authorized()
+        if user_id is None or not self._lock.acquire(blocking=False):
+            metrics.incr('profiling.skipped')
+            return
+        
+        g.profile = {
+            'id': f'{datetime.utcnow():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:8]}',
+            'user_id': user_id,
+            'started': time.perf_counter(),
+            'sql': {}
+        }
+        g.profile['profiler'] = profiler = cProfile.Profile()
+        profiler.enable()
+    
+    def _finish(self, response):
+        profile = g.pop('profile', None)
+        if profile is None:
+            return response
+        profile['profiler'].disable()
+        self._lock.release()
+        duration = time.perf_counter() - profile['started']
+        
+        try:
+            self._save(profile, duration, response.status_code)
+            response.headers['X-Profile-Id'] = profile['id']
+            metrics.incr('profiling.saved')
+        except OSError:
+            metrics.incr('profiling.failed')
+        return response
+    
+    def _release(self, error=None):
+        # The view raised past after_request
+        profile = g.pop('profile', None)
+        if profile is not None:
+            profile['profiler'].disable()
+            self._lock.release()
+    
+    # SQL timings
+    
+    @staticmethod
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if has_request_context() and 'profile' in g:
+            conn.info.setdefault('profile_started', []).append(time.perf_counter())
+    
+    @staticmethod
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not has_request_context() or 'profile' not in g:
+            return
+        started = conn.info.get('profile_started')
+        if not started:
+            return
+        elapsed = time.perf_counter() - started.pop()
+        entry = g.profile['sql'].setdefault(statement[:MAX_STATEMENT_LENGTH], [0, 0.0])
+        entry[0] += 1
+        entry[1] += elapsed
+    
+    # Storage
+    
+    def _save(self, profile, duration, status):
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, profile['id'])
+        profile['profiler'].dump_stats(f'{base}.prof')
+        
+        statements = sorted(profile['sql'].items(), key=lambda item: item[1][1], reverse=True)
+        with open(f'{base}.json', 'w') as f:
+            json.dump({
+                'id': profile['id'],
+                'endpoint': request.endpoint,
+                'method': request.method,
+                'path': request.path,
+                'args': {key: value for key, value in request.args.items() if key != 'jwt'},
+                'status': status,
+                'user_id': profile['user_id'],
+                'duration_ms': round(duration * 1000, 3),
+                'sql_ms': round(sum(total for _, total in profile['sql'].values()) * 1000, 3),
+                'queries': sum(count for count, _ in profile['sql'].values()),
+                'statements': [
+                    {'statement': statement, 'count': count, 'total_ms': round(total * 1000, 3)}
+                    for statement, (count, total) in statements
+                ]
+            }, f)
+        self._prune()
+    
+    def _prune(self):
+        ids = sorted(name[:-len('.json')] for name in os.listdir(self.directory) if name.endswith('.json'))
+        for profile_id in ids[:max(0, len(ids) - self.max_profiles)]:
+            for suffix in ('.json', '.prof'):
+                try:
+                    os.remove(os.path.join(self.directory, profile_id + suffix))
+                except FileNotFoundError:
+                    pass
+    
+    def profiles(self, endpoint=None):
+        """Stored profile metadata, newest first, optionally for one endpoint"""
+        if not os.path.isdir(self.directory):
+            return []
+        found = []
+        for name in sorted(os.listdir(self.directory), reverse=True):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.directory, name)) as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if endpoint is None or meta.get('endpoint') == endpoint:
+                found.append(meta)
+        return found
+    
+    def hot_functions(self, profiles, limit=20, sort='cumulative'):
+        """Top functions over the given profiles, merged: [(function, calls, tottime, cumtime)]"""
+        paths = [
+            os.path.join(self.directory, f'{meta["id"]}.prof') for meta in profiles
+            if os.path.exists(os.path.join(self.directory, f'{meta["id"]}.prof'))
+        ]
+        if not paths:
+            return []
+        stats = pstats.Stats(*paths)
+        column = 3 if sort == 'cumulative' else 2
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][column], reverse=True)[:limit]
+        return [
+            (_short_name(function), calls, tottime, cumtime)
+            for function, (_, calls, tottime, cumtime, _) in rows
+        ]
+
+
+request_profiler = RequestProfiler()
@@ -0,0 +1,90 @@
+import queue
+import threading
+
+
+class TooManySubscribers(Exception):
+    pass
+
+
+class Subscription:
+    """One subscriber's bounded message queue. Close it when the client leaves."""
+    
+    def __init__(self, pubsub, topic, max_queue):
+        self._pubsub = pubsub
+        self.topic = topic
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.overflowed = False
+    
+    def get(self, timeout):
+        """Next message, or raise queue.Empty after `timeout` seconds"""
+        return self.queue.get(timeout=timeout)
+    
+    def close(self):
+        self._pubsub._unsubscribe(self)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class PubSub:
+    """In-process topic fan-out for live updates.
+    
+    Publishers never block: if a subscriber's queue is full the message is
+    dropped for that subscriber and it is flagged as overflowed, so it can
+    tell its client to resync. Only subscribers in this process receive
+    messages published here; utils/live_feed.py publishes what any process
+    committed.
+    """
+    
+    def __init__(self, max_queue=100):
+        self._lock = threading.Lock()
+        self._topics = {}
+        self._count = 0
+        self._max_queue = max_queue
+    
+    def subscribe(self, topic, max_connections):
+        with self._lock:
+            if self._count >= max_connections:
+                raise TooManySubscribers()
+            subscription = Subscription(self, topic, self._max_queue)
+            self._topics.setdefault(topic, set()).add(subscription)
+            self._count += 1
+            return subscription
+    
+    def _unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._topics.get(subscription.topic)
+            if subscribers and subscription in subscribers:
+                subscribers.remove(subscription)
+                self._count -= 1
+                if not subscribers:
+                    del self._topics[subscription.topic]
+    
+    def has_subscribers(self, topic):
+        return topic in self._topics
+    
+    def topics(self):
+        """Topics with at least one subscriber"""
+        with self._lock:
+            return list(self._topics)
+    
+    def publish(self, topic, message):
+        with self._lock:
+            subscribers = list(self._topics.get(topic, ()))
+        for subscription in subscribers:
+            try:
+                subscription.queue.put_nowait(message)
+            except queue.Full:
+                subscription.overflowed = True
+        return len(subscribers)
+    
+    @property
+    def connection_count(self):
+        return self._count
+
+
+# Attendance changes per class session id, consumed by the SSE stream
+attendance_feed = PubSub()
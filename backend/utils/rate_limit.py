@@ -0,0 +1,203 @@
+import math
+import sqlite3
+import threading
+import time
+from flask import request, jsonify
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+from utils.metrics import metrics
+
+
+# Endpoints whose requests name an account by PRN (registering doesn't count:
+# its PRN is new, so a bucket for it would always be full)
+ACCOUNT_ENDPOINTS = ('auth.login', 'auth.forgot_password', 'auth.reset_password')
+
+
+class RateLimitStore:
+    """Token bucket storage. Subclass this to share buckets between processes."""
+    
+    def consume(self, key, rate, capacity, now):
+        """Take one token from `key`'s bucket.
+        
+        `rate` is tokens refilled per second and `capacity` the bucket size.
+        Returns (allowed, retry_after_seconds).
+        """
+        raise NotImplementedError
+
+
+def _refill(tokens, updated, rate, capacity, now):
+    return min(capacity, tokens + (now - updated) * rate)
+
+
+def _take(tokens, rate):
+    if tokens >= 1:
+        return True, tokens - 1, 0.0
+    return False, tokens, (1 - tokens) / rate
+
+
+class MemoryStore(RateLimitStore):
+    """Per-process buckets (the default). Each worker enforces its own budget."""
+    
+    # Buckets idle this long have refilled under any budget of up to an hour,
+    # and a full bucket behaves exactly like a missing one
+    IDLE_SECONDS = 3600
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._last_prune = 0.0
+    
+    def consume(self, key, rate, capacity, now):
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = _refill(tokens, updated, rate, capacity, now)
+            allowed, tokens, retry_after = _take(tokens, rate)
+            self._buckets[key] = (tokens, now)
+            
+            if now - self._last_prune > self.IDLE_SECONDS:
+                self._prune(now)
+            return allowed, retry_after
+    
+    def _prune(self, now):
+        self._last_prune = now
+        cutoff = now - self.IDLE_SECONDS
+        for key in [key for key, (_, updated) in self._buckets.items() if updated < cutoff]:
+            del self._buckets[key]
+
+
+class SQLiteStore(RateLimitStore):
+    """Buckets in a small SQLite file shared by all workers on one host.
+    
+    Kept separate from the application database so limiter writes never
+    contend with attendance writes.
+    """
+    
+    def __init__(self, path):
+        self._path = path
+        self._local = threading.local()
+        with self._connect() as connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS rate_limit_buckets '
+                '(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)'
+            )
+    
+    def _connect(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self._path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            self._local.connection = connection
+        return connection
+    
+    def consume(self, key, rate, capacity, now):
+        connection = self._connect()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            row = connection.execute(
+                'SELECT tokens, updated FROM rate_limit_buckets WHERE key = ?', (key,)
+            ).fetchone()
+            tokens, updated = row if row else (capacity, now)
+            tokens = _refill(tokens, updated, rate, capacity, now)
+            allowed, tokens, retry_after = _take(tokens, rate)
+            connection.execute(
+                'INSERT OR REPLACE INTO rate_limit_buckets (key, tokens, updated) VALUES (?, ?, ?)',
+                (key, tokens, now)
+            )
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+        return allowed, retry_after
+
+
+def create_store(url):
+    """Build a store from RATELIMIT_STORAGE_URL ('memory://' or 'sqlite:///path')"""
+    if url.startswith('memory://'):
+        return MemoryStore()
+    if url.startswith('sqlite:///'):
+        return SQLiteStore(url[len('sqlite:///'):])
+    raise ValueError(f'Unsupported rate limit storage: {url}')
+
+
+class RateLimiter:
+    """Token bucket limiting per blueprint, keyed by user id or client IP.
+    Login and password resets also draw on a bucket per PRN
+    (RATELIMIT_ACCOUNT_BUDGET), so guessing one account's password is slow
+    however many addresses it comes from. Behind a reverse proxy, set PROXY_FIX_X_FOR so the client IP is taken
+    from X-Forwarded-For rather than being the proxy's.
+    
+    Budgets come from RATELIMIT_BUDGETS: {blueprint name: (requests, seconds)}.
+    A client may burst up to `requests` and is then refilled at
+    requests/seconds. Blueprints without a budget are never limited, which
+    keeps the attendance write path free of limiter overhead.
+    """
+    
+    def __init__(self, app=None):
+        self.store = None
+        self.budgets = {}
+        self.account_budget = None
+        if app is not None:
+            self.init_app(app)
+    
+    def init_app(self, app):
+        self.budgets = {
+            name: (requests / seconds, requests)
+            for name, (requests, seconds) in app.config.get('RATELIMIT_BUDGETS', {}).items()
+        }
+        account = app.config.get('RATELIMIT_ACCOUNT_BUDGET')
+        self.account_budget = (account[0] / account[1], account[0]) if account else None
+        self.store = create_store(app.config.get('RATELIMIT_STORAGE_URL', 'memory://'))
+        if app.config.get('RATELIMIT_ENABLED', True) and self.budgets:
+            app.before_request(self.check)
+    
+    def _client_key(self):
+        try:
+            verify_jwt_in_request(optional=True)
+            user_id = get_jwt_identity()
+        except Exception:
+            # Invalid tokens are rejected by the view itself
+            user_id = None
+        if user_id is not None:
+            return f'user:{user_id}'
+        return f'ip:{request.remote_addr}'
+    
+    def _account_key(self):
+        """PRN named by a login or password reset request (None otherwise)"""
+        if request.endpoint not in ACCOUNT_ENDPOINTS:
+            return None
+        data = request.get_json(silent=True) if request.is_json else None
+        if isinstance(data, dict) and isinstance(data.get('prn'), str):
+            return f'prn:{data["prn"].strip().upper()}'
+        return None
+    
+    def check(self):
+        budget = self.budgets.get(request.blueprint)
+        if budget is None or request.method == 'OPTIONS':
+            return None
+        
+        now = time.time()
+        rate, capacity = budget
+        client_key = self._client_key()
+        allowed, retry_after = self.store.consume(f'{request.blueprint}:{client_key}', rate, capacity, now)
+        
+        # Every client pays its own bucket; requests naming an account also
+        # pay that account's, so rotating PRNs doesn't buy a fresh budget
+        account_key = self._account_key() if client_key.startswith('ip:') else None
+        if account_key is not None and self.account_budget is not None:
+            account_allowed, account_retry = self.store.consume(
+                f'{request.blueprint}:{account_key}', *self.account_budget, now
+            )
+            allowed = allowed and account_allowed
+            retry_after = max(retry_after, account_retry)
+        
+        if allowed:
+            metrics.incr(f'rate_limit.{request.blueprint}.allowed')
+            return None
+        
+        metrics.incr(f'rate_limit.{request.blueprint}.limited')
+        response = jsonify({'error': 'Too many requests, please slow down'})
+        response.status_code = 429
+        response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+        return response
+
+
+rate_limiter = RateLimiter()
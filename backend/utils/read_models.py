@@ -0,0 +1,103 @@
+from sqlalchemy import select, inspect
+from app import db
+
+# Largest IN list sent when loading related records
+IN_CHUNK_SIZE = 500
+
+
+class Record:
+    """A row of one model as a plain object, for read-only endpoints.
+    
+    Subclasses (see record_class) get __slots__ for the model's columns and
+    relationships, so a record costs a fraction of an ORM instance: no
+    identity map entry, instance state, change tracking or lazy loaders.
+    Columns that weren't selected are simply unset.
+    """
+    __slots__ = ()
+    
+    def __repr__(self):
+        values = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__ if hasattr(self, name))
+        return f'<{type(self).__name__} {values}>'
+
+
+_record_classes = {}
+
+
+def record_class(model):
+    """The Record subclass for `model` (created once, then cached)"""
+    cls = _record_classes.get(model)
+    if cls is None:
+        mapper = inspect(model)
+        namespace = {
+            '__slots__': tuple(attr.key for attr in mapper.column_attrs) + tuple(mapper.relationships.keys())
+        }
+        # Computed fields are plain properties over columns (e.g. subject_name),
+        # so records can share them
+        for attribute, _ in getattr(model, 'COMPUTED_FIELDS', {}).values():
+            namespace[attribute] = getattr(model, attribute)
+        cls = type(f'{model.__name__}Record', (Record,), namespace)
+        _record_classes[model] = cls
+    return cls
+
+
+class ReadModel:
+    """Loads a Fieldset's rows through Core selects into Records.
+    
+    select() returns a select of exactly the columns the fieldset needs; add
+    filters, joins and ordering to it as with a query, then pass it to all().
+    Expanded relationships are loaded with one IN query per relationship and
+    level, like selectinload. Serialize with fieldset.serialize_all(); the
+    output is the same as from ORM instances.
+    """
+    
+    def __init__(self, fieldset):
+        self.fieldset = fieldset
+    
+    def select(self):
+        return self._select(self.fieldset)
+    
+    def all(self, stmt):
+        records = self._records(self.fieldset, stmt)
+        self._load_children(self.fieldset, records)
+        return records
+    
+    @staticmethod
+    def _select(fieldset, extra=()):
+        model = fieldset.model
+        columns = fieldset.columns + [column for column in extra if column not in fieldset.columns]
+        return select(*[getattr(model, column) for column in columns])
+    
+    @staticmethod
+    def _records(fieldset, stmt):
+        cls = record_class(fieldset.model)
+        names = [column.key for column in stmt.selected_columns]
+        records = []
+        for row in db.session.execute(stmt):
+            record = cls()
+            for name, value in zip(names, row):
+                setattr(record, name, value)
+            records.append(record)
+        return records
+    
+    def _load_children(self, fieldset, records):
+        if not records:
+            return
+        mapper = inspect(fieldset.model)
+        for name, child in fieldset.children.items():
+            # Many-to-one: local foreign key -> remote key (e.g. user_id -> users.id)
+            (local, remote), = mapper.relationships[name].local_remote_pairs
+            keys = {getattr(record, local.key) for record in records} - {None}
+            
+            related = {}
+            key_column = getattr(child.model, remote.key)
+            ordered_keys = sorted(keys)
+            for start in range(0, len(ordered_keys), IN_CHUNK_SIZE):
+                stmt = self._select(child, extra=[remote.key]).where(
+                    key_column.in_(ordered_keys[start:start + IN_CHUNK_SIZE])
+                )
+                for record in self._records(child, stmt):
+                    related[getattr(record, remote.key)] = record
+            
+            self._load_children(child, list(related.values()))
+            for record in records:
+                setattr(record, name, related.get(getattr(record, local.key)))
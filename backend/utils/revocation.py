@@ -0,0 +1,136 @@
+import threading
+import time
+from flask import current_app, request
+from sqlalchemy import select, func
+from app import db
+from models.token_revocation import TokenRevocation
+from utils.cache import invalidate_on_commit
+from utils.metrics import metrics
+from utils.sharding import shard_router, SHARD_CLAIM
+
+# JWT claim carrying the user's token version at issue time
+VERSION_CLAIM = 'ver'
+# JWT claim limiting a token to one session's live stream
+STREAM_CLAIM = 'stream'
+STREAM_ENDPOINT = 'attendance.stream_session_attendance'
+
+
+def revoke_tokens(user, reason=None):
+    """Invalidate every token issued to `user` so far.
+    
+    Adds to the caller's transaction; tokens stop being accepted once it
+    commits. Issue fresh tokens with token_claims(user).
+    """
+    user.token_version = (user.token_version or 0) + 1
+    db.session.add(TokenRevocation(
+        user_id=user.id,
+        token_version=user.token_version,
+        reason=reason
+    ))
+
+
+def token_claims(user):
+    """Extra claims for create_access_token / create_refresh_token"""
+    return {VERSION_CLAIM: user.token_version or 0, **shard_router.claims(user.department)}
+
+
+def stream_claims(user, session_id):
+    """Claims for a token that only opens `session_id`'s live stream"""
+    return {**token_claims(user), STREAM_CLAIM: session_id}
+
+
+def refreshed_claims(jwt_payload):
+    """Claims for an access token issued from an accepted refresh token"""
+    claims = {VERSION_CLAIM: jwt_payload.get(VERSION_CLAIM, 0)}
+    if SHARD_CLAIM in jwt_payload:
+        claims[SHARD_CLAIM] = jwt_payload[SHARD_CLAIM]
+    return claims
+
+
+class RevocationList:
+    """Current token version per user with a revocation, kept in memory.
+    
+    Checking a token is a dict lookup. The list is versioned by the highest
+    token_revocations id applied, and refreshing reads only newer rows, at
+    most once every REVOCATION_REFRESH_SECONDS. A commit that revokes tokens
+    in this process marks the list stale, so the next request refreshes and
+    the revocation applies immediately here and within the refresh interval
+    in other workers. Tokens without a version claim count as version 0.
+    
+    With sharding, user ids repeat across databases, so entries are kept
+    per database and tokens without a shard claim (issued before sharding
+    was enabled) are rejected.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions = {}  # (shard key, user id) -> token version
+        self._watermarks = {}  # shard key -> highest token_revocations id applied
+        self._refreshed_at = None
+    
+    def init_app(self, app):
+        from app import jwt
+        jwt.token_in_blocklist_loader(self.is_token_revoked)
+    
+    def is_token_revoked(self, jwt_header, jwt_payload):
+        self._refresh_if_due()
+        if STREAM_CLAIM in jwt_payload and (
+            request.endpoint != STREAM_ENDPOINT
+            or (request.view_args or {}).get('session_id') != jwt_payload[STREAM_CLAIM]
+        ):
+            # Stream tokens travel in URLs, so they are good for nothing else
+            metrics.incr('revocation.rejected')
+            return True
+        if shard_router.enabled and SHARD_CLAIM not in jwt_payload:
+            metrics.incr('revocation.rejected')
+            return True
+        key = shard_router.key_for(jwt_payload.get(SHARD_CLAIM))
+        current = self._versions.get((key, jwt_payload['sub']))
+        revoked = current is not None and jwt_payload.get(VERSION_CLAIM, 0) < current
+        if revoked:
+            metrics.incr('revocation.rejected')
+        return revoked
+    
+    def _refresh_if_due(self):
+        interval = current_app.config.get('REVOCATION_REFRESH_SECONDS', 2)
+        refreshed_at = self._refreshed_at
+        if refreshed_at is not None and time.monotonic() - refreshed_at < interval:
+            return
+        # One refresh at a time; other requests keep using the current list
+        if self._lock.acquire(blocking=refreshed_at is None):
+            try:
+                self.refresh()
+            finally:
+                self._lock.release()
+    
+    def refresh(self):
+        started = time.monotonic()
+        versions = dict(self._versions)
+        watermarks = dict(self._watermarks)
+        with metrics.timer('revocation.refresh'):
+            for key in shard_router.keys():
+                # Own connection, so the check doesn't open a transaction on the
+                # request's session before the view runs
+                with shard_router.engine(key).connect() as connection:
+                    rows = connection.execute(
+                        select(
+                            TokenRevocation.user_id,
+                            func.max(TokenRevocation.token_version),
+                            func.max(TokenRevocation.id)
+                        ).where(TokenRevocation.id > watermarks.get(key, 0)).group_by(TokenRevocation.user_id)
+                    ).all()
+                for user_id, token_version, last_id in rows:
+                    versions[(key, user_id)] = max(versions.get((key, user_id), 0), token_version)
+                    watermarks[key] = max(watermarks.get(key, 0), last_id)
+        # Swap rather than mutate so lock-free readers never see a partial update
+        self._versions = versions
+        self._watermarks = watermarks
+        self._refreshed_at = started
+    
+    def expire(self):
+        self._refreshed_at = None
+
+
+revocation_list = RevocationList()
+
+invalidate_on_commit(TokenRevocation, revocation_list.expire)
@@ -0,0 +1,202 @@
+from datetime import date, datetime, timedelta
+from sqlalchemy import select, insert, delete, func, case, tuple_, union_all
+from app import db
+from models.attendance import Attendance
+from models.class_session import ClassSession
+from models.archive import ArchivedAttendance, ArchivedClassSession
+from models.rollup import AttendanceRollup, RollupState
+from utils.archive import includes_archive
+from utils.changes import current_version
+from utils.metrics import metrics
+
+COUNTERS = ('sessions', 'total_records', 'present', 'absent', 'late')
+
+# Dimension name (as used by ?group_by=) -> cube column
+DIMENSIONS = {
+    'department': AttendanceRollup.department,
+    'class': AttendanceRollup.class_name,
+    'subject': AttendanceRollup.subject_id,
+    'week': AttendanceRollup.week_start
+}
+
+# Most cells per DELETE / IN list
+CELL_CHUNK_SIZE = 500
+
+
+def week_start(day):
+    """Monday of `day`'s week"""
+    return day - timedelta(days=day.weekday())
+
+
+def week_end(day):
+    """Sunday of `day`'s week"""
+    return week_start(day) + timedelta(days=6)
+
+
+def _chunks(items, size):
+    items = list(items)
+    for index in range(0, len(items), size):
+        yield items[index:index + size]
+
+
+class RollupCube:
+    """Department x class x subject x week attendance totals.
+    
+    refresh() brings the attendance_rollups rows up to date incrementally:
+    it finds the cells touched by sessions and attendance with a change
+    version above the last one applied, and recomputes just those cells
+    from the raw rows, archived years included. Recomputing whole cells
+    makes a refresh idempotent, so concurrent or repeated refreshes are
+    harmless. Sessions never move between cells (the cell columns are part
+    of the session slot), and archiving doesn't change the totals.
+    
+    Only sessions up to today count, as timetable generation pre-creates
+    attendance for future ones; cells are recomputed again once their days
+    arrive. Refreshing is the job of `flask rollups refresh` (cron).
+    
+    slice() reads only the cube. Each shard has its own cube.
+    """
+    
+    # Refresh
+    
+    def _day_totals(self, attendance_model, session_model, cells):
+        """Per (department, class, subject, date) totals from one pair of tables.
+        
+        Outer joined, so sessions without attendance still count as sessions.
+        """
+        stmt = select(
+            session_model.department, session_model.class_name, session_model.subject_id, session_model.date,
+            func.count(func.distinct(session_model.id)),
+            func.count(attendance_model.id),
+            *[func.sum(case((attendance_model.status == status, 1), else_=0)) for status in ('present', 'absent', 'late')]
+        ).outerjoin_from(
+            session_model, attendance_model, attendance_model.class_session_id == session_model.id
+        ).where(session_model.date <= date.today())
+        
+        if cells is not None:
+            # The weeks' date span for the cells' (department, class, subject)
+            weeks = [cell[3] for cell in cells]
+            stmt = stmt.where(
+                session_model.date.between(min(weeks), max(weeks) + timedelta(days=6)),
+                tuple_(session_model.department, session_model.class_name, session_model.subject_id).in_(
+                    {cell[:3] for cell in cells}
+                )
+            )
+        return stmt.group_by(
+            session_model.department, session_model.class_name, session_model.subject_id, session_model.date
+        )
+    
+    def _changed_cells(self, low, high, since):
+        """Cells with a session or attendance record written in (low, high],
+        or with a session whose day came after `since`"""
+        session_cells = select(
+            ClassSession.department, ClassSession.class_name, ClassSession.subject_id, ClassSession.date
+        )
+        stmt = union_all(
+            session_cells.where(ClassSession.version > low, ClassSession.version <= high),
+            session_cells.join(Attendance).where(Attendance.version > low, Attendance.version <= high),
+            session_cells.where(ClassSession.date > since, ClassSession.date <= date.today())
+        )
+        return {
+            (department, class_name, subject_id, week_start(day))
+            for department, class_name, subject_id, day in db.session.execute(select(stmt.subquery()).distinct())
+        }
+    
+    def _compute(self, cells=None):
+        """{cell: counters} for `cells` (None: every cell)"""
+        if cells is not None and not cells:
+            return {}
+        
+        selects = [self._day_totals(Attendance, ClassSession, cells)]
+        if includes_archive(min(cell[3] for cell in cells) if cells else None):
+            selects.append(self._day_totals(ArchivedAttendance, ArchivedClassSession, cells))
+        
+        totals = {}
+        for select_ in selects:
+            for department, class_name, subject_id, day, *counts in db.session.execute(select_):
+                cell = (department, class_name, subject_id, week_start(day))
+                if cells is not None and cell not in cells:
+                    continue
+                combined = totals.setdefault(cell, [0] * len(COUNTERS))
+                for index, count in enumerate(counts):
+                    combined[index] += count or 0
+        return totals
+    
+    def refresh(self, full=False):
+        """Apply changes since the last refresh (everything with full=True); returns cells written"""
+        with metrics.timer('rollups.refresh'):
+            written = self._refresh(full)
+        metrics.incr('rollups.cells_written', written)
+        return written
+    
+    def _refresh(self, full):
+        high = current_version()
+        state = db.session.get(RollupState, 1)
+        if state is None:
+            state = RollupState(id=1, version=0)
+            db.session.add(state)
+            full = True
+        
+        table = AttendanceRollup.__table__
+        if full:
+            cells = None
+            db.session.execute(delete(table))
+        else:
+            # A day before the last refresh's (UTC) date, to be safe around midnight
+            since = (state.refreshed_at or datetime.utcnow()).date() - timedelta(days=1)
+            cells = self._changed_cells(state.version, high, since)
+            for chunk in _chunks(cells, CELL_CHUNK_SIZE):
+                db.session.execute(delete(table).where(
+                    tuple_(table.c.department, table.c.class_name, table.c.subject_id, table.c.week_start).in_(chunk)
+                ))
+        
+        totals = self._compute(cells)
+        rows = [
+            {
+                'department': department, 'class_name': class_name, 'subject_id': subject_id, 'week_start': week,
+                **dict(zip(COUNTERS, counts))
+            }
+            for (department, class_name, subject_id, week), counts in totals.items()
+        ]
+        for chunk in _chunks(rows, CELL_CHUNK_SIZE):
+            db.session.execute(insert(table), chunk)
+        
+        state.version = max(state.version or 0, high)
+        state.refreshed_at = datetime.utcnow()
+        db.session.commit()
+        return len(rows)
+    
+    # Reads
+    
+    def refreshed_at(self):
+        """When the current database's cube was last refreshed (None: never)"""
+        return db.session.execute(select(RollupState.refreshed_at).where(RollupState.id == 1)).scalar()
+    
+    def slice(self, group_by, department=None, class_name=None, subject_id=None, start_date=None, end_date=None):
+        """Summed counters per combination of the `group_by` dimensions, from the cube only.
+        
+        Cells are whole weeks: a date range covers every week it overlaps.
+        """
+        columns = [DIMENSIONS[name] for name in group_by]
+        where = []
+        if department:
+            where.append(AttendanceRollup.department == department)
+        if class_name:
+            where.append(AttendanceRollup.class_name == class_name)
+        if subject_id is not None:
+            where.append(AttendanceRollup.subject_id == subject_id)
+        if start_date:
+            where.append(AttendanceRollup.week_start >= week_start(start_date))
+        if end_date:
+            where.append(AttendanceRollup.week_start <= week_start(end_date))
+        
+        stmt = select(
+            *columns, *[func.sum(getattr(AttendanceRollup, counter)) for counter in COUNTERS]
+        ).where(*where).group_by(*columns).order_by(*columns)
+        return [
+            (tuple(row[:len(columns)]), list(row[len(columns):]))
+            for row in db.session.execute(stmt)
+        ]
+
+
+rollup_cube = RollupCube()
@@ -0,0 +1,98 @@
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+from sqlalchemy import select, and_, func
+from app import db
+from models.user import User
+from utils.cache import invalidate_on_commit
+from utils.metrics import metrics
+from utils.sharding import shard_router
+
+
+class RosterCache:
+    """Student ids per class roster, shared by every attendance recording.
+    
+    Keys are (department, class, division, roll_start, roll_end). Users don't
+    carry a division or roll number yet, so those parts of the key don't
+    narrow the query today; they are kept so a lecture for a sub-range never
+    shares an entry with the whole class once they do. Only the ids are held,
+    since that's all attendance insertion needs.
+    
+    Any committed change to a user clears the cache. Changes made by other
+    worker processes are noticed through the users table's row count and
+    latest updated_at, checked at most every ROSTER_CACHE_CHECK_SECONDS per
+    database. The generation counter stops a build that raced with an
+    invalidation from storing stale ids.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rosters = OrderedDict()
+        self._generation = 0
+        self._stamps = {}  # shard key -> (users stamp, monotonic time checked)
+    
+    def get(self, department, class_name, division=None, roll_start=None, roll_end=None):
+        shard = shard_router.current()
+        key = (shard, department, class_name, division, roll_start, roll_end)
+        self._check_if_due(shard)
+        
+        with self._lock:
+            student_ids = self._rosters.get(key)
+            if student_ids is not None:
+                self._rosters.move_to_end(key)
+                generation = None
+            else:
+                generation = self._generation
+        
+        if student_ids is not None:
+            metrics.incr('roster_cache.hits')
+            return student_ids
+        
+        metrics.incr('roster_cache.misses')
+        with metrics.timer('roster_cache.build'):
+            student_ids = self._build(department, class_name)
+        
+        with self._lock:
+            if generation == self._generation:
+                self._rosters[key] = student_ids
+                max_size = current_app.config.get('ROSTER_CACHE_SIZE', 256)
+                while len(self._rosters) > max_size:
+                    self._rosters.popitem(last=False)
+        return student_ids
+    
+    def _build(self, department, class_name):
+        rows = db.session.execute(
+            select(User.id).where(
+                and_(
+                    User.role == 'student',
+                    User.class_name == class_name,
+                    User.department == department
+                )
+            ).order_by(User.id)
+        ).scalars().all()
+        return tuple(rows)
+    
+    def _check_if_due(self, shard):
+        interval = current_app.config.get('ROSTER_CACHE_CHECK_SECONDS', 2)
+        previous = self._stamps.get(shard)
+        if previous is not None and time.monotonic() - previous[1] < interval:
+            return
+        
+        checked_at = time.monotonic()
+        stamp = tuple(db.session.execute(select(func.count(User.id), func.max(User.updated_at))).one())
+        if previous is not None and previous[0] != stamp:
+            metrics.incr('roster_cache.stale')
+            self.invalidate()
+        self._stamps = {**self._stamps, shard: (stamp, checked_at)}
+    
+    def invalidate(self):
+        with self._lock:
+            self._rosters.clear()
+            self._generation += 1
+        metrics.incr('roster_cache.invalidations')
+
+
+roster_cache = RosterCache()
+
+invalidate_on_commit(User, roster_cache.invalidate)
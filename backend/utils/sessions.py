@@ -0,0 +1,51 @@
+from sqlalchemy import select
+from app import db
+from models.attendance import Attendance
+from models.class_session import ClassSession
+from utils.upsert import insert_for
+
+# Columns of uq_class_sessions_slot / uq_attendances_user_session
+SESSION_SLOT_COLUMNS = ['teacher_id', 'subject_id', 'class_name', 'date', 'start_time']
+ATTENDANCE_KEY_COLUMNS = ['user_id', 'class_session_id']
+
+
+def upsert_class_session(values):
+    """Insert a class session unless its slot already exists.
+    
+    `values` holds ClassSession column values. Returns (session_id, created);
+    when the slot was already taken the existing session's id is returned
+    and nothing is written.
+    """
+    stmt = insert_for(ClassSession.__table__).values(**values)
+    stmt = stmt.on_conflict_do_nothing(index_elements=SESSION_SLOT_COLUMNS).returning(ClassSession.id)
+    session_id = db.session.execute(stmt).scalar()
+    if session_id is not None:
+        return session_id, True
+    
+    session_id = db.session.execute(
+        select(ClassSession.id).filter_by(**{column: values[column] for column in SESSION_SLOT_COLUMNS})
+    ).scalar_one()
+    return session_id, False
+
+
+def insert_attendance_rows(rows):
+    """Bulk insert attendance rows, skipping (user, session) pairs that exist.
+    
+    Existing rows keep whatever status the teacher has already marked.
+    Returns the number of rows inserted.
+    """
+    if not rows:
+        return 0
+    stmt = insert_for(Attendance.__table__).on_conflict_do_nothing(index_elements=ATTENDANCE_KEY_COLUMNS)
+    return db.session.execute(stmt, rows).rowcount
+
+
+def insert_class_sessions(rows):
+    """Bulk insert class sessions, skipping slots that are already taken.
+    
+    Returns the number of sessions inserted.
+    """
+    if not rows:
+        return 0
+    stmt = insert_for(ClassSession.__table__).on_conflict_do_nothing(index_elements=SESSION_SLOT_COLUMNS)
+    return db.session.execute(stmt, rows).rowcount
@@ -0,0 +1,161 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from flask import current_app, g, has_app_context
+from flask_jwt_extended import verify_jwt_in_request, get_jwt
+from flask_sqlalchemy.session import Session
+from sqlalchemy import select
+
+# JWT claim naming the database a token's user lives in: their department
+# when it has a shard, MAIN_SHARD otherwise
+SHARD_CLAIM = 'shard'
+MAIN_SHARD = ''
+
+
+class ShardedSession(Session):
+    """db.session class that sends every statement to the current database.
+    
+    Without sharding, or for departments that stay in the main database,
+    this is the stock Flask-SQLAlchemy session.
+    """
+    
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            key = shard_router.current()
+            if key is not None:
+                return self._db.engines[key]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class ShardRouter:
+    """Maps departments to their own databases.
+    
+    Every department in SHARD_DEPARTMENTS gets a database with the full
+    schema at SHARD_DATABASE_URL, registered as a Flask-SQLAlchemy bind
+    named after the department; other departments stay in the main database.
+    Keys are the department for a shard and None for the main database.
+    
+    Ids are only unique within one database, so an app context is pinned to
+    one database for its whole life: a request to the database named in its
+    token, or to the one route() picks for unauthenticated lookups such as
+    login. Work across departments runs once per database via fan_out(), and
+    use() runs a block (a CLI job) against a given database.
+    """
+    
+    def __init__(self):
+        self.departments = []
+        self.max_workers = 8
+    
+    @property
+    def enabled(self):
+        return bool(self.departments)
+    
+    def init_app(self, app):
+        """Register one bind per shard; must run before db.init_app()"""
+        self.departments = list(app.config.get('SHARD_DEPARTMENTS') or [])
+        if not self.enabled:
+            return
+        
+        # Flask-SQLAlchemy only applies SQLALCHEMY_ENGINE_OPTIONS to the main
+        # engine; shards get the same options (e.g. the archive schema map)
+        template = app.config['SHARD_DATABASE_URL']
+        engine_options = app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+        binds = app.config.setdefault('SQLALCHEMY_BINDS', {})
+        for department in self.departments:
+            binds[department] = {**engine_options, 'url': template.format(department=department.lower())}
+        self.max_workers = app.config.get('SHARD_FANOUT_WORKERS', 8)
+        app.before_request(self._route_request)
+    
+    def keys(self):
+        """Every database: None for the main one, then each shard"""
+        return [None] + self.departments
+    
+    def key_for(self, department):
+        return department if department in self.departments else None
+    
+    def current(self):
+        return g.get('shard') if has_app_context() else None
+    
+    def owns(self, department):
+        """Whether `department`'s rows live in the current database"""
+        return self.key_for(department) == self.current()
+    
+    def engine(self, key=None):
+        return current_app.extensions['sqlalchemy'].engines[key]
+    
+    def claims(self, department):
+        """Extra JWT claims pinning a user's tokens to their database"""
+        if not self.enabled:
+            return {}
+        return {SHARD_CLAIM: self.key_for(department) or MAIN_SHARD}
+    
+    def route(self, key):
+        """Pin the current request to one database; call before its first query"""
+        if key != self.current():
+            current_app.extensions['sqlalchemy'].session.remove()
+            g.shard = key
+    
+    def locate(self, *criteria):
+        """Key of the first database with a user matching `criteria` (None if none)"""
+        from models.user import User
+        
+        if not self.enabled:
+            return None
+        stmt = select(User.id).where(*criteria).limit(1)
+        session = current_app.extensions['sqlalchemy'].session
+        for key, found in self.fan_out(lambda: session.execute(stmt).first()):
+            if found is not None:
+                return key
+        return None
+    
+    def exists(self, *criteria):
+        """Whether any database has a user matching `criteria`.
+        
+        PRNs and emails identify a user across all databases (login finds
+        the database by PRN), so uniqueness is checked in every one.
+        """
+        from models.user import User
+        
+        stmt = select(User.id).where(*criteria).limit(1)
+        session = current_app.extensions['sqlalchemy'].session
+        return any(found is not None for _, found in self.fan_out(lambda: session.execute(stmt).first()))
+    
+    @contextmanager
+    def use(self, key):
+        """Run a block in a fresh app context bound to one database"""
+        with current_app._get_current_object().app_context():
+            g.shard = key
+            yield
+    
+    def fan_out(self, fn):
+        """Call fn() once per database, in parallel; returns [(key, result)].
+        
+        Each call gets its own app context (and so its own session) bound to
+        one database. Without sharding fn() runs once, in the current context.
+        """
+        if not self.enabled:
+            return [(None, fn())]
+        
+        app = current_app._get_current_object()
+        
+        def run(key):
+            with app.app_context():
+                g.shard = key
+                return fn()
+        
+        keys = self.keys()
+        with ThreadPoolExecutor(max_workers=min(len(keys), self.max_workers), thread_name_prefix='shard') as pool:
+            return list(zip(keys, pool.map(run, keys)))
+    
+    def _route_request(self):
+        try:
+            # Query string too, for EventSource streams (?jwt=)
+            verify_jwt_in_request(optional=True, locations=['headers', 'query_string'])
+        except Exception:
+            # Bad or expired tokens are reported by the view's @jwt_required
+            return
+        claims = get_jwt()
+        if SHARD_CLAIM in claims:
+            g.shard = self.key_for(claims[SHARD_CLAIM])
+
+
+shard_router = ShardRouter()
@@ -0,0 +1,88 @@
+import sys
+import threading
+from sqlalchemy import select
+from app import db
+from models.subject import Subject
+from utils.cache import invalidate_on_commit, invalidate_when_done
+from utils.upsert import insert_for
+from utils.sharding import shard_router
+
+
+class SubjectCache:
+    """In-process id <-> name lookup for the subject catalog.
+    
+    Sessions store a small integer `subject_id`; this cache turns ids back
+    into (interned) names for serialization and names into ids for
+    filtering, without a join or query per row. The whole catalog is loaded
+    on first use and dropped whenever a subject row is committed. Ids are
+    never reused, so other worker processes only need to reload when they
+    see an id or name they don't know yet. With sharding each database has
+    its own catalog (and ids), cached separately.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._maps = {}  # shard key -> (id -> name, name -> id)
+    
+    def _load(self):
+        key = shard_router.current()
+        maps = self._maps.get(key)
+        if maps is None:
+            with self._lock:
+                maps = self._maps.get(key)
+                if maps is None:
+                    rows = db.session.execute(select(Subject.id, Subject.name)).all()
+                    names = {subject_id: sys.intern(name) for subject_id, name in rows}
+                    maps = (names, {name: subject_id for subject_id, name in names.items()})
+                    self._maps = {**self._maps, key: maps}
+        return maps
+    
+    def invalidate(self):
+        self._maps = {}
+    
+    def name_for(self, subject_id):
+        """Return the subject name for an id (None if it doesn't exist)"""
+        if subject_id is None:
+            return None
+        names, _ = self._load()
+        if subject_id not in names:
+            # Created by another process since we loaded
+            self.invalidate()
+            names, _ = self._load()
+        return names.get(subject_id)
+    
+    def id_for(self, name):
+        """Return the id for a subject name (None if it isn't in the catalog)"""
+        _, ids = self._load()
+        if name in ids:
+            return ids[name]
+        
+        subject_id = db.session.execute(
+            select(Subject.id).where(Subject.name == name)
+        ).scalar()
+        if subject_id is not None:
+            self.invalidate()
+        return subject_id
+    
+    def get_or_create(self, name, department=None):
+        """Return the id for a subject name, adding it to the catalog if needed.
+        
+        The subject is inserted in the caller's transaction with ON CONFLICT
+        DO NOTHING, so a concurrent request creating it first is not an
+        error and the caller's other work is never rolled back. Other
+        processes pick the new subject up on their first miss.
+        """
+        name = name.strip()
+        subject_id = self.id_for(name)
+        if subject_id is not None:
+            return subject_id
+        
+        stmt = insert_for(Subject.__table__).values(name=name, department=department)
+        db.session.execute(stmt.on_conflict_do_nothing(index_elements=['name']))
+        invalidate_when_done(db.session(), self.invalidate)
+        return self.id_for(name)
+
+
+subject_cache = SubjectCache()
+
+invalidate_on_commit(Subject, subject_cache.invalidate)
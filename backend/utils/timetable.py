@@ -0,0 +1,101 @@
+from datetime import timedelta
+from sqlalchemy import select, and_
+from app import db
+from models.class_session import ClassSession
+from models.timetable import TimetableSlot, Holiday
+from utils.roster_cache import roster_cache
+from utils.sessions import SESSION_SLOT_COLUMNS, insert_class_sessions, insert_attendance_rows
+from utils.metrics import metrics
+
+
+def _holidays(start_date, end_date):
+    """{date: set of departments}, where None stands for the whole college"""
+    closed = {}
+    for day, department in db.session.execute(
+        select(Holiday.date, Holiday.department).where(Holiday.date.between(start_date, end_date))
+    ):
+        closed.setdefault(day, set()).add(department)
+    return closed
+
+
+def generate_sessions(start_date, end_date, default_status='present'):
+    """Create the timetable's class sessions between two dates (inclusive).
+    
+    Each session also gets one attendance row per student on its roster with
+    `default_status`, so recording only has to update the exceptions. Slots
+    that already have a session (from an earlier run, or recorded by hand)
+    are left alone, which makes reruns safe. Holidays are skipped. Writes are
+    added to the caller's transaction.
+    
+    Returns a dict of counts.
+    """
+    slots = TimetableSlot.query.filter(TimetableSlot.is_active.isnot(False)).all()
+    closed = _holidays(start_date, end_date)
+    
+    planned = []
+    holidays_skipped = 0
+    day = start_date
+    while day <= end_date:
+        for slot in slots:
+            if not slot.runs_on(day):
+                continue
+            departments = closed.get(day, ())
+            if None in departments or slot.department in departments:
+                holidays_skipped += 1
+                continue
+            planned.append((slot, day))
+        day += timedelta(days=1)
+    
+    with metrics.timer('timetable.insert_sessions'):
+        created = insert_class_sessions([
+            {
+                'subject_id': slot.subject_id,
+                'class_name': slot.class_name,
+                'department': slot.department,
+                'division': slot.division,
+                'date': day,
+                'start_time': slot.start_time,
+                'end_time': slot.end_time,
+                'teacher_id': slot.teacher_id,
+                'roll_start': slot.roll_start,
+                'roll_end': slot.roll_end
+            }
+            for slot, day in planned
+        ])
+    
+    # Session ids by slot key, whether created now or earlier
+    session_ids = {}
+    if planned:
+        rows = db.session.execute(
+            select(ClassSession.id, *[getattr(ClassSession, column) for column in SESSION_SLOT_COLUMNS]).where(
+                and_(
+                    ClassSession.date.between(start_date, end_date),
+                    ClassSession.teacher_id.in_({slot.teacher_id for slot, _ in planned})
+                )
+            )
+        )
+        session_ids = {tuple(row[1:]): row[0] for row in rows}
+    
+    attendance_rows = []
+    for slot, day in planned:
+        session_id = session_ids[(slot.teacher_id, slot.subject_id, slot.class_name, day, slot.start_time)]
+        student_ids = roster_cache.get(slot.department, slot.class_name, slot.division, slot.roll_start, slot.roll_end)
+        attendance_rows.extend(
+            {
+                'user_id': student_id,
+                'class_session_id': session_id,
+                'status': default_status,
+                'recorded_by': slot.teacher_id
+            }
+            for student_id in student_ids
+        )
+    
+    with metrics.timer('timetable.insert_attendances'):
+        attendances = insert_attendance_rows(attendance_rows)
+    
+    return {
+        'sessions_planned': len(planned),
+        'sessions_created': created,
+        'attendances_created': attendances,
+        'holidays_skipped': holidays_skipped
+    }
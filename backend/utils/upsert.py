@@ -0,0 +1,16 @@
+from sqlalchemy.dialects import postgresql, sqlite
+from app import db
+
+
+def insert_for(table):
+    """Return a dialect-specific INSERT for `table` that supports ON CONFLICT.
+    
+    Both SQLite and PostgreSQL expose on_conflict_do_nothing() and
+    on_conflict_do_update() on their insert constructs.
+    """
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        return postgresql.insert(table)
+    if dialect == 'sqlite':
+        return sqlite.insert(table)
+    raise NotImplementedError(f'ON CONFLICT inserts are not supported on {dialect}')
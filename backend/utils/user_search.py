@@ -0,0 +1,36 @@
+import re
+from sqlalchemy import select, table, column, text, literal_column
+from models.user import User
+
+# rowid of each users_fts row is the users.id it indexes
+users_fts = table('users_fts', column('rowid'))
+
+# bm25 with column weights name, prn, email; lower is better
+RANK = literal_column('bm25(users_fts, 10.0, 5.0, 2.0)')
+
+_TOKEN = re.compile(r'\w+', re.UNICODE)
+
+
+def match_expression(q):
+    """FTS5 query matching every word of `q` as a prefix, or None if it has none.
+    
+    Words are quoted, so nothing a user types is parsed as FTS syntax.
+    """
+    tokens = _TOKEN.findall(q or '')
+    if not tokens:
+        return None
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def filter_by_search(query, q):
+    """Narrow a User query (or select) to full-text matches of `q`.
+    
+    Returns (query, rank column to order by). The match runs in a
+    materialized CTE: joined directly, SQLite may prefer walking users by
+    ix_users_roster and re-running the full-text query for every row.
+    """
+    matches = select(
+        users_fts.c.rowid.label('user_id'),
+        RANK.label('rank')
+    ).where(text('users_fts MATCH :match').bindparams(match=match_expression(q))).cte('user_matches').prefix_with('MATERIALIZED')
+    return query.join(matches, matches.c.user_id == User.id), matches.c.rank
@@ -0,0 +1,20 @@
+"""
+WSGI entry point for the production server.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+The app is built once here; with preload_app enabled gunicorn imports this
+module in the master and forks workers from it. Table creation and seeding
+are not done here - run `flask --app wsgi init-db` before starting.
+"""
+import os
+import time
+
+_load_started = time.perf_counter()
+
+from app import create_app
+
+app = create_app(os.environ.get('FLASK_CONFIG', 'production'))
+
+startup_seconds = time.perf_counter() - _load_started
+app.config['STARTUP_SECONDS'] = startup_seconds